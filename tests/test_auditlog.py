@@ -0,0 +1,87 @@
+"""AuditLog migration, the logs tail and appends (nested in an outer transaction, or concurrent)."""
+
+import json, os, subprocess, sys, tempfile, unittest
+
+TOOLS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools")
+sys.path.insert(0, TOOLS)
+
+from registry_core import auditlog
+from registry_core.auditlog import AuditLog
+from registry_core.hashing import sha256_file
+from registry_core.txn import output_txn
+
+class OuterTxnTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        os.makedirs("audit/logs")
+        # Pre-segmented log: entry files plus a head without pageSize, no pages/
+        for seq in (1, 2, 3):
+            with open(f"audit/logs/{seq:06d}.json", "w", encoding="utf-8") as f:
+                json.dump({"seq": seq, "time": f"2026-01-0{seq}T00:00:00Z"}, f)
+        with open("audit/logs/index.json", "w", encoding="utf-8") as f:
+            json.dump({"latest": "/audit/logs/000003.json"}, f)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_migrate_and_append_in_outer_txn(self):
+        log = AuditLog()
+        with output_txn():
+            self.assertEqual(log.append({"time": "2026-01-04T00:00:00Z"})[0], 4)
+            self.assertEqual(log.append({"time": "2026-01-05T00:00:00Z"})[0], 5)
+
+        page = json.load(open(log.page_path(0), encoding="utf-8"))
+        self.assertEqual([e["seq"] for e in page["entries"]], [1, 2, 3, 4, 5])
+        head = log.head()
+        self.assertEqual((head["latestSeq"], head["pageSize"]), (5, 1000))
+        # The second append chained to the first one's staged bytes
+        self.assertEqual(log.entry(5)["prevEntrySha256"], f"sha256:{sha256_file(log.entry_path(4))}")
+
+    def test_failed_outer_txn_leaves_log_untouched(self):
+        log = AuditLog()
+        log.ensure_paged()
+        with self.assertRaises(RuntimeError):
+            with output_txn():
+                log.append({"time": "2026-01-04T00:00:00Z"})
+                raise RuntimeError("abort")
+        self.assertEqual(log.head()["latestSeq"], 3)
+        self.assertFalse(os.path.exists(log.entry_path(4)))
+
+    def test_logs_tail_survives_migration_and_appends(self):
+        log = AuditLog()
+        log.append({"time": "2026-01-04T00:00:00Z"})
+        self.assertEqual(log.head()["logs"], [f"/audit/logs/00000{q}.json" for q in (1, 2, 3, 4)])
+
+        # A head written without "logs" gets it back from the pages; the list stays bounded
+        head = log.head()
+        del head["logs"]
+        with open(log.index_path, "w", encoding="utf-8") as f:
+            json.dump(head, f)
+        saved, auditlog.LOGS_TAIL = auditlog.LOGS_TAIL, 3
+        try:
+            log.append({"time": "2026-01-05T00:00:00Z"})
+        finally:
+            auditlog.LOGS_TAIL = saved
+        self.assertEqual(log.head()["logs"], [f"/audit/logs/00000{q}.json" for q in (3, 4, 5)])
+
+    def test_concurrent_appends_take_distinct_seqs(self):
+        AuditLog().ensure_paged()
+        child = (f"import sys; sys.path.insert(0, {TOOLS!r})\n"
+                 "from registry_core.auditlog import AuditLog\n"
+                 "for i in range(10):\n"
+                 "    AuditLog().append({'time': '2026-02-01T00:00:00Z'})\n")
+        procs = [subprocess.Popen([sys.executable, "-c", child]) for _ in range(3)]
+        self.assertEqual([p.wait(timeout=60) for p in procs], [0, 0, 0])
+
+        log = AuditLog()
+        head = log.head()
+        self.assertEqual(head["latestSeq"], 33)
+        self.assertEqual([e["seq"] for e in log.between(1)], list(range(1, 34)))
+        for seq in range(5, 34):
+            self.assertEqual(log.entry(seq)["prevEntrySha256"], f"sha256:{sha256_file(log.entry_path(seq - 1))}")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""derive_wikipedia --batch against a fake MediaWiki API on a local http.server."""
+
+import json, os, sys, tempfile, threading, unittest, urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools"))
+
+import derive_wikipedia
+
+CATS = {t: [f"Category:{t} topic {i}" for i in range(4)] for t in ("Alpha Beta", "Gamma")}
+
+class FakeWiki(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests: list[list[str]] = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        q = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(self.path).query))
+        titles = q["titles"].split("|")
+        FakeWiki.requests.append(titles)
+        if "Broken" in titles:
+            # Promise more bytes than are sent: the client sees http.client.IncompleteRead
+            self.send_response(200)
+            self.send_header("Content-Length", "100")
+            self.end_headers()
+            self.wfile.write(b'{"query":')
+            self.close_connection = True
+            return
+        # Categories come in two continuation batches
+        part = int(q.get("clcontinue", "0"))
+        out = {"query": {"pages": [], "normalized": [], "redirects": []}}
+        for t in titles:
+            r = t
+            if t == "gamma":
+                out["query"]["normalized"].append({"from": "gamma", "to": "Gamma"})
+                r = "Gamma"
+            if t == "AB":
+                out["query"]["redirects"].append({"from": "AB", "to": "Alpha Beta"})
+                r = "Alpha Beta"
+            if r not in CATS:
+                out["query"]["pages"].append({"title": r, "missing": True})
+                continue
+            cats = CATS[r][:2] if part == 0 else CATS[r][2:]
+            out["query"]["pages"].append({"title": r, "pageid": len(r), "fullurl": f"https://w/{r}",
+                                          "categories": [{"ns": 14, "title": c} for c in cats]})
+        if part == 0:
+            out["continue"] = {"clcontinue": "1", "continue": "||"}
+        body = json.dumps(out).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+class BatchTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeWiki)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        self.saved = derive_wikipedia.WIKI_API, derive_wikipedia.MAX_TITLES
+        derive_wikipedia.WIKI_API = f"http://127.0.0.1:{self.server.server_address[1]}/w/api.php"
+        derive_wikipedia.MAX_TITLES = 2
+        FakeWiki.requests = []
+
+    def tearDown(self):
+        derive_wikipedia.WIKI_API, derive_wikipedia.MAX_TITLES = self.saved
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def run_batch(self, lines: list[str], max_age: float) -> int:
+        with open("titles.tsv", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return derive_wikipedia.batch("titles.tsv", 2, max_age)
+
+    def record(self, rid: str) -> dict:
+        with open(f"data/{rid}.jsonld", encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_chunks_redirects_and_failures(self):
+        rc = self.run_batch(["Alpha Beta\tE000001", "gamma\tE000002", "Broken\tE000003", "Nope\tE000004"], 0)
+        self.assertEqual(rc, 1)
+        # Two chunks of MAX_TITLES; the broken one fails alone
+        self.assertEqual(sorted(os.listdir("data")), ["E000001.jsonld", "E000002.jsonld"])
+        gamma = self.record("E000002")
+        self.assertEqual(gamma["rdfs:label"]["en"], "Gamma")
+        self.assertIn("topic", gamma["registry:tags"])
+        # Continuation merged: both category batches are in the raw file
+        with open("sources/raw/wikipedia/gamma/query.json", encoding="utf-8") as f:
+            cats = json.load(f)["query"]["pages"][0]["categories"]
+        self.assertEqual(len(cats), 4)
+
+    def test_cache_hit_keeps_raw_file_and_retrieval_time(self):
+        self.assertEqual(self.run_batch(["AB\tE000001"], 0), 0)
+        raw = "sources/raw/wikipedia/alpha-beta/query.json"
+        self.assertTrue(os.path.isfile("sources/raw/wikipedia/ab/redirect.json"))
+        then = 1_700_000_000
+        os.utime(raw, (then, then))
+        n = len(FakeWiki.requests)
+
+        self.assertEqual(self.run_batch(["AB\tE000001"], 10 ** 9), 0)
+        self.assertEqual(len(FakeWiki.requests), n)  # served from the cache
+        self.assertEqual(os.stat(raw).st_mtime, then)  # the cache age keeps counting
+        rec = self.record("E000001")
+        self.assertEqual(rec["registry:source"]["retrievedAt"], derive_wikipedia.iso_time(then))
+        self.assertEqual(rec["registry:issuedAt"], derive_wikipedia.iso_time(then))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""output_txn: rewrites within one transaction, missing staged files, the staging lock."""
+
+import os, subprocess, sys, tempfile, textwrap, time, unittest
+
+TOOLS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools")
+sys.path.insert(0, TOOLS)
+
+from registry_core.jsonio import write_bytes
+from registry_core.txn import output_txn
+
+def read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+class OutputTxnTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        write_bytes("out.txt", b"A")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_rewrite_back_to_published_bytes(self):
+        with output_txn():
+            self.assertTrue(write_bytes("out.txt", b"B"))
+            self.assertTrue(write_bytes("out.txt", b"A"))
+            self.assertFalse(write_bytes("out.txt", b"A"))
+        self.assertEqual(read("out.txt"), b"A")
+
+    def test_last_write_wins(self):
+        with output_txn():
+            write_bytes("out.txt", b"B")
+            write_bytes("out.txt", b"C")
+        self.assertEqual(read("out.txt"), b"C")
+
+    def test_missing_staged_file_fails_the_commit(self):
+        with self.assertRaises(RuntimeError):
+            with output_txn() as txn:
+                write_bytes("out.txt", b"B")
+                os.remove(txn.staged["out.txt"])
+        self.assertEqual(read("out.txt"), b"A")
+
+    def test_second_process_waits_for_the_stage(self):
+        # The child opens a transaction while ours is staged; it must neither
+        # discard our stage nor commit before we do
+        child = textwrap.dedent(f"""
+            import sys; sys.path.insert(0, {TOOLS!r})
+            from registry_core.jsonio import write_bytes
+            from registry_core.txn import output_txn
+            with output_txn():
+                write_bytes("other.txt", b"X")
+        """)
+        with output_txn():
+            write_bytes("out.txt", b"B")
+            proc = subprocess.Popen([sys.executable, "-c", child])
+            time.sleep(0.5)
+            self.assertIsNone(proc.poll())
+            self.assertFalse(os.path.exists("other.txt"))
+        self.assertEqual(proc.wait(timeout=10), 0)
+        self.assertEqual((read("out.txt"), read("other.txt")), (b"B", b"X"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""verify_audit_chain.py: chainStart, stripped links, truncation and the advancing anchor."""
+
+import json, os, subprocess, sys, tempfile, unittest
+
+TOOLS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools")
+sys.path.insert(0, TOOLS)
+
+from registry_core.auditlog import AuditLog
+
+STATE = ".build/audit_chain.json"
+
+class VerifyChainTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        os.makedirs("audit/logs")
+        # Two legacy entries (no link), then three chained ones
+        for seq in (1, 2):
+            with open(f"audit/logs/{seq:06d}.json", "w", encoding="utf-8") as f:
+                json.dump({"seq": f"{seq:06d}", "time": "2026-01-01T00:00:00Z"}, f)
+        with open("audit/logs/index.json", "w", encoding="utf-8") as f:
+            json.dump({"latest": "/audit/logs/000002.json"}, f)
+        self.log = AuditLog()
+        for _ in range(3):
+            self.log.append({"time": "2026-01-02T00:00:00Z"})
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def verify(self, *args) -> tuple[int, str]:
+        r = subprocess.run([sys.executable, os.path.join(TOOLS, "verify_audit_chain.py"), *args],
+                           capture_output=True, text=True)
+        return r.returncode, r.stdout
+
+    def edit(self, path: str, fn) -> None:
+        with open(path, encoding="utf-8") as f:
+            doc = json.load(f)
+        fn(doc)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(doc, f)
+
+    def strip_links(self) -> None:
+        for seq in (3, 4, 5):
+            self.edit(self.log.entry_path(seq), lambda e: e.pop("prevEntrySha256"))
+
+    def test_head_records_chain_start(self):
+        self.assertEqual(self.log.head()["chainStart"], 3)
+        self.assertEqual(self.verify()[0], 0)
+
+    def test_stripped_links_fail(self):
+        self.strip_links()
+        rc, out = self.verify()
+        self.assertEqual(rc, 2, out)
+        self.assertIn("no prevEntrySha256", out)
+
+    def test_state_pins_chain_start(self):
+        self.assertEqual(self.verify("--state", STATE)[0], 0)
+        # Stripping the links and the head's chainStart fools a stateless run, not a pinned one
+        self.strip_links()
+        self.edit(self.log.index_path, lambda h: h.pop("chainStart"))
+        self.assertEqual(self.verify()[0], 0)
+        rc, out = self.verify("--state", STATE)
+        self.assertEqual(rc, 2, out)
+        self.assertIn("chainStart", out)
+
+    def test_anchor_advances_and_truncation_fails(self):
+        self.assertEqual(self.verify("--state", STATE)[0], 0)
+        with open(STATE, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["seq"], 5)
+        self.log.append({"time": "2026-01-03T00:00:00Z"})
+        rc, out = self.verify("--state", STATE)
+        self.assertEqual(rc, 0, out)
+        self.assertIn("links=1", out)  # only the new entry is walked
+
+        self.edit(self.log.index_path, lambda h: h.update(latest="/audit/logs/000004.json", latestSeq=4))
+        rc, out = self.verify("--state", STATE)
+        self.assertEqual(rc, 2, out)
+        self.assertIn("truncated", out)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""reg_verify_manifest.py against http.server serving a copy of the built tree."""
+
+import functools, json, os, shutil, subprocess, sys, tempfile, threading, time, unittest
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+TOOLS = os.path.join(ROOT, "tools")
+
+class Site(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    seen: list[str] = []
+    throttle: set[str] = set()  # paths answered once with 429 + Retry-After
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        Site.seen.append(self.path)
+        if self.path in Site.throttle:
+            Site.throttle.discard(self.path)
+            self.send_response(429)
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        super().do_GET()
+
+class VerifyManifestTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        for d in ("data", "api/v1/merkle"):
+            shutil.copytree(os.path.join(ROOT, d), os.path.join(self.tmp.name, d))
+        shutil.copy(os.path.join(ROOT, "api/v1/manifest.json"), os.path.join(self.tmp.name, "api/v1"))
+        with open(os.path.join(self.tmp.name, "api/v1/manifest.json"), encoding="utf-8") as f:
+            self.ids = sorted(json.load(f)["records"])
+        Site.seen, Site.throttle = [], set()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Site, directory=self.tmp.name))
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def verify(self, *args) -> tuple[int, str]:
+        env = {k: v for k, v in os.environ.items() if not k.lower().endswith("_proxy")}
+        env.update(REGISTRY_BASE=f"http://127.0.0.1:{self.server.server_address[1]}", REGISTRY_HTTP_CACHE="off")
+        r = subprocess.run([sys.executable, os.path.join(TOOLS, "reg_verify_manifest.py"), *args],
+                           capture_output=True, text=True, cwd=self.tmp.name, env=env)
+        return r.returncode, r.stdout
+
+    def test_all_records_verify(self):
+        rc, out = self.verify("-c", "4")
+        self.assertEqual(rc, 0, out)
+        self.assertIn(f"SUMMARY: ok={len(self.ids)} fail=0", out)
+
+    def test_tampered_record_fails(self):
+        rid = self.ids[0]
+        path = os.path.join(self.tmp.name, "data", f"{rid}.jsonld")
+        with open(path, encoding="utf-8") as f:
+            rec = json.load(f)
+        rec["tampered"] = True
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(rec, f)
+        rc, out = self.verify()
+        self.assertEqual(rc, 2, out)
+        self.assertIn(f"FAIL {rid}", out)
+        self.assertIn(f"SUMMARY: ok={len(self.ids) - 1} fail=1", out)
+
+    def test_retry_after_is_honoured(self):
+        path = f"/data/{self.ids[0]}.jsonld"
+        Site.throttle = {path}
+        start = time.monotonic()
+        rc, out = self.verify("-c", "4")
+        self.assertEqual(rc, 0, out)
+        self.assertIn(f"SUMMARY: ok={len(self.ids)} fail=0", out)
+        self.assertEqual(Site.seen.count(path), 2)  # one 429, one retry
+        self.assertGreaterEqual(time.monotonic() - start, 1.0)
+
+if __name__ == "__main__":
+    unittest.main()
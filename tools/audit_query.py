@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+import json, sys
+
+from registry_core.auditlog import AuditLog
+
+def main():
+    argv = sys.argv[1:]
+    full = "--full" in argv
+    argv = [a for a in argv if a != "--full"]
+    if not 1 <= len(argv) <= 2:
+        print("USAGE: python3 tools/audit_query.py [--full] <fromSeq> [<toSeq>]", file=sys.stderr)
+        return 2
+
+    log = AuditLog()
+    a = int(argv[0])
+    b = int(argv[1]) if len(argv) == 2 else None
+    for e in log.between(a, b):
+        # --full loads each entry file; the default touches only the index pages
+        print(json.dumps(log.entry(e["seq"]) if full else e, ensure_ascii=False))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,31 +1,15 @@
 #!/usr/bin/env python3
-import json, os, re, hashlib, subprocess
+import json, os
 from datetime import datetime, timezone
 
-IDX = "audit/logs/index.json"
-MANI = "api/v1/manifest.json"
-
-def sha256_file(path: str) -> str:
-    h = hashlib.sha256()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()
+from registry_core import (BinManifest, delta_path, diff, git_head, load_json, output_txn,
+                           sha256_file, write_bin_manifest, write_json)
+from registry_core.auditlog import AuditLog
+from registry_core.delta import DELTA_DIR, HEAD_BIN, INDEX as DELTA_INDEX, advertise
 
-def next_seq(latest_path: str | None) -> str:
-    if not latest_path:
-        return "000001"
-    m = re.search(r"/(\d{6})\.json$", latest_path)
-    if not m:
-        return "000001"
-    n = int(m.group(1)) + 1
-    return f"{n:06d}"
-
-def git_head() -> str:
-    try:
-        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True).strip()
-    except Exception:
-        return "UNKNOWN"
+MANI = "api/v1/manifest.json"
+MERKLE = "api/v1/merkle/root.json"
+CAPABILITIES = "api/v1/capabilities.json"
 
 def main():
     os.makedirs("audit/logs", exist_ok=True)
@@ -33,42 +17,65 @@ def main():
     if not os.path.isfile(MANI):
         raise SystemExit(f"FAIL: missing {MANI} (run build/release first)")
 
-    idx = {"latest": None, "logs": []}
-    if os.path.isfile(IDX):
-        with open(IDX, "r", encoding="utf-8") as f:
-            idx = json.load(f)
-
-    seq = next_seq(idx.get("latest"))
-    out = f"audit/logs/{seq}.json"
-
     now = datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
     entry = {
-        "seq": seq,
         "time": now,
         "gitCommit": git_head(),
         "apiVersion": "v1",
         "manifest": f"/{MANI}",
         "manifestSha256": f"sha256:{sha256_file(MANI)}"
     }
+    if os.path.isfile(MERKLE):
+        with open(MERKLE, "r", encoding="utf-8") as f:
+            entry["merkleRoot"] = json.load(f)["root"]
 
-    with open(out, "w", encoding="utf-8") as f:
-        json.dump(entry, f, indent=2, ensure_ascii=False)
-        f.write("\n")
+    log = AuditLog()
+    # Migrate an unpaged log in its own transaction before staging anything else
+    log.ensure_paged()
+    sealed = {rid: r["contentHash"] for rid, r in load_json(MANI).get("records", {}).items()}
+    # Entry, delta and delta head land together: a delta always names a real seq
+    with output_txn():
+        seq = log.next_seq()
+        prev = load_json(DELTA_INDEX) if os.path.isfile(DELTA_INDEX) and os.path.isfile(HEAD_BIN) else None
+        delta = None
+        if prev:
+            with BinManifest(HEAD_BIN) as bm:
+                added, changed, removed = diff(dict(bm), sealed)
+            delta = {
+                "apiVersion": "v1",
+                "seq": seq,
+                "prevSeq": prev["latestSeq"],
+                "prevManifestSha256": prev["manifestSha256"],
+                "manifestSha256": entry["manifestSha256"],
+                "counts": {"added": len(added), "changed": len(changed), "removed": len(removed)},
+                "added": added,
+                "changed": changed,
+                "removed": removed,
+            }
+            write_json(delta_path(seq), delta)
+            entry["delta"] = f"/{delta_path(seq)}"
 
-    latest = f"/audit/logs/{seq}.json"
-    logs = idx.get("logs", [])
-    logs.append(latest)
-
-    idx2 = {
-        "latest": latest,
-        "logs": logs
-    }
-    with open(IDX, "w", encoding="utf-8") as f:
-        json.dump(idx2, f, indent=2, ensure_ascii=False)
-        f.write("\n")
+        seq, out = log.append(entry)
+        write_bin_manifest(HEAD_BIN, sealed)
+        write_json(DELTA_INDEX, {
+            "apiVersion": "v1",
+            "latestSeq": seq,
+            "manifestSha256": entry["manifestSha256"],
+            "deltaTemplate": f"/{DELTA_DIR}/{{SEQ}}.json",
+            "seqs": (prev["seqs"] if prev else []) + ([seq] if delta else []),
+        })
+        # The delta endpoints are advertised from the first published base on
+        caps = load_json(CAPABILITIES) if os.path.isfile(CAPABILITIES) else None
+        if caps is not None and advertise(caps):
+            write_json(CAPABILITIES, caps)
 
     print(f"OK: wrote {out}")
-    print(f"OK: updated {IDX} latest={latest}")
+    print(f"OK: updated {log.index_path} latest={log.head()['latest']}")
+    if delta:
+        c = delta["counts"]
+        print(f"OK: wrote {delta_path(seq)} (+{c['added']} ~{c['changed']} -{c['removed']} since seq {delta['prevSeq']})")
+    else:
+        print(f"OK: wrote {HEAD_BIN} (first delta base at seq {seq})")
 
 if __name__ == "__main__":
     raise SystemExit(main())
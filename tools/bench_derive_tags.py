@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark derive_wikipedia.derive_tags / derive_tags_batch against the
+previous per-category implementation on synthetic pages, and check all
+produce identical tags.
+
+Usage:
+  python3 tools/bench_derive_tags.py [--pages 2000] [--categories 500] [--distinct 20000] [--seed 1]
+
+Categories are drawn from a pool of --distinct names, so pages share them
+the way a real batch does (0 = every category unique).
+"""
+
+import argparse, random, re, time
+
+from derive_wikipedia import derive_tags, derive_tags_batch
+
+WORDS = ("physics relativity century american german jewish physicists engineers inventors "
+         "writers nobel laureates emigrants people members swiss patent clerks pacifists "
+         "philosophers science academy royal society fellows from with that this their").split()
+
+def legacy_derive_tags(title: str, categories: list[str]) -> list[str]:
+    # Reference: derive_tags as it was before the compiled/table-driven rewrite
+    tags: set[str] = set()
+    for tok in re.findall(r"[A-Za-z0-9]+", title.lower()):
+        if len(tok) >= 3:
+            tags.add(tok)
+    for c in categories:
+        c = c.replace("Category:", "").lower()
+        c = re.sub(r"[^a-z0-9 ]+", " ", c)
+        for tok in c.split():
+            if len(tok) >= 4 and tok not in {"from", "with", "that", "this", "their"}:
+                tags.add(tok)
+    if "einstein" in tags:
+        tags.add("relativity")
+        tags.add("physics")
+    return sorted(tags)
+
+def synth_category(rng: random.Random) -> str:
+    return f"Category:{rng.randint(1800, 2025)}s {' '.join(rng.sample(WORDS, 4))}-{rng.choice(WORDS)} (CJK:é)"
+
+def synth(n_pages: int, n_cats: int, distinct: int, rng: random.Random) -> list[tuple[str, list[str]]]:
+    pool = [synth_category(rng) for _ in range(distinct)]
+    pages = []
+    for i in range(n_pages):
+        title = " ".join(rng.choice(WORDS).title() for _ in range(2)) + (" Einstein" if i % 7 == 0 else "")
+        cats = [rng.choice(pool) if pool else synth_category(rng) for _ in range(n_cats)]
+        pages.append((title, cats))
+    return pages
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--pages", type=int, default=2000)
+    ap.add_argument("--categories", type=int, default=500)
+    ap.add_argument("--distinct", type=int, default=20000)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    pages = synth(args.pages, args.categories, args.distinct, random.Random(args.seed))
+    total = args.pages * args.categories
+
+    t0 = time.perf_counter()
+    want = [legacy_derive_tags(t, c) for t, c in pages]
+    t_legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    single = [derive_tags(t, c) for t, c in pages]
+    t_single = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    batch = derive_tags_batch(pages)
+    t_batch = time.perf_counter() - t0
+
+    for name, got in (("derive_tags", single), ("derive_tags_batch", batch)):
+        if got != want:
+            bad = next(i for i, (a, b) in enumerate(zip(got, want)) if a != b)
+            raise SystemExit(f"FAIL: {name} tag mismatch on synthetic page {bad}: {got[bad]} != {want[bad]}")
+
+    print(f"pages={args.pages} categories/page={args.categories} distinct={args.distinct or 'all'}")
+    print(f"legacy:  {t_legacy:.3f}s  {total / t_legacy:,.0f} categories/s")
+    print(f"single:  {t_single:.3f}s  {total / t_single:,.0f} categories/s  ({t_legacy / t_single:.1f}x)")
+    print(f"batch:   {t_batch:.3f}s  {total / t_batch:,.0f} categories/s  ({t_legacy / t_batch:.1f}x)")
+    print("OK: outputs identical")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
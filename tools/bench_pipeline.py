@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Benchmark the build/verify pipeline on a synthetic registry.
+
+Usage:
+  python3 tools/bench_pipeline.py [--size 1k|100k|1m|N] [--jobs N] [--stages a,b,...]
+                                  [--out FILE] [--dir DIR] [--keep]
+
+Generates N records shaped like data/E000003.jsonld (plus their
+manifests/ids.json and a copy of audit/) in a scratch directory, runs each
+stage there as its own process and writes wall time, peak RSS and files
+written per stage to a JSON results file (default
+.build/bench/results-<N>.json). Stage output goes to
+<dir>/logs/<stage>.log.
+
+Stages (default: all but verify-manifest):
+  build, build-incremental-cold, build-incremental-warm, latest-audit,
+  bundles, resolve, render, check, verify-manifest, reseal
+verify-manifest serves the scratch tree over a local http.server and points
+REGISTRY_BASE at it; reseal runs last because it rewrites data/.
+"""
+
+import argparse, os, platform, shutil, socket, subprocess, sys, time
+from datetime import datetime, timezone
+
+TOOLS = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(TOOLS)
+sys.path.insert(0, TOOLS)
+
+from registry_core import PLACEHOLDER, IdIndex, json_bytes, write_json
+from registry_core.ids import INDEX_PATH
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+PREFIXES = "EFGH"  # 999999 IDs per prefix letter
+WORDS = ("albert einstein marie curie ada lovelace alan turing grace hopper niels bohr "
+         "physics chemistry computing mathematics relativity radioactivity logic").split()
+
+def stage_cmds(jobs: int) -> dict[str, list[str]]:
+    j = ["--jobs", str(jobs)]
+    return {
+        "build": ["build_api_v1.py", *j],
+        "build-incremental-cold": ["build_api_v1.py", "--incremental", *j],
+        "build-incremental-warm": ["build_api_v1.py", "--incremental", *j],
+        "latest-audit": ["build_api_v1_latest_audit.py"],
+        "bundles": ["gen_api_v1_bundles.py"],
+        "resolve": ["gen_api_v1_resolve.py"],
+        "render": ["render_pages.py", *j],
+        "check": ["reg_check_all.py", *j],
+        "verify-manifest": ["reg_verify_manifest.py"],
+        "reseal": ["reg_reseal.py", "--all", *j],
+    }
+
+DEFAULT_STAGES = [s for s in stage_cmds(1) if s != "verify-manifest"]
+
+def parse_size(s: str) -> int:
+    return SIZES.get(s.lower()) or int(s)
+
+def synth_id(i: int) -> str:
+    return f"{PREFIXES[i // 999_999]}{i % 999_999 + 1:06d}"
+
+def synth_record(rid: str, i: int) -> dict:
+    # Same keys and nesting as data/E000003.jsonld
+    a, b = WORDS[i % len(WORDS)], WORDS[(i * 7 + 3) % len(WORDS)]
+    title = f"{a.title()} {b.title()} {i}"
+    slug = f"{a}-{b}-{i}"
+    return {
+        "@context": "https://registry.parasks/ontology/v1/context.jsonld",
+        "@id": f"https://registry.parasks/id/{rid}",
+        "@type": ["Entity", "Identifier"],
+        "contentHash": PLACEHOLDER,
+        "dcterms:conformsTo": {"@id": "https://registry.parasks/ontology/v1"},
+        "issuedAt": "2026-01-27T00:00:00Z",
+        "issuedBy": {"@id": "https://registry.parasks/id/A000001"},
+        "notation": rid,
+        "prefLabel": {"en": title},
+        "recordState": {"@id": "https://registry.parasks/def/recordState#Published"},
+        "source": {
+            "wikipedia": {
+                "name": "Wikipedia",
+                "pageTitle": title,
+                "pageUrl": f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}",
+                "raw": {"@id": f"https://napier369.github.io/registry.parasks/sources/raw/wikipedia/{slug}/query.json"},
+                "retrievedAt": "2026-01-27T00:00:00Z"
+            }
+        },
+        "tags": sorted({a, b, WORDS[i % 5]})
+    }
+
+def generate(root: str, n: int) -> None:
+    if n > len(PREFIXES) * 999_999:
+        raise SystemExit(f"FAIL: at most {len(PREFIXES) * 999_999} synthetic records")
+    os.makedirs(os.path.join(root, "data"), exist_ok=True)
+    ids = []
+    for i in range(n):
+        rid = synth_id(i)
+        with open(os.path.join(root, "data", f"{rid}.jsonld"), "wb") as f:
+            f.write(json_bytes(synth_record(rid, i)))
+        ids.append(rid)
+    # The generators list IDs from the index, as in the real tree
+    index = IdIndex()
+    index.sync(sorted(ids))
+    write_json(os.path.join(root, INDEX_PATH), index.doc())
+    shutil.copytree(os.path.join(REPO, "audit"), os.path.join(root, "audit"), dirs_exist_ok=True)
+
+def files_since(root: str, start_ns: int) -> int:
+    # Files created or rewritten since start_ns (logs and local state excluded)
+    n = 0
+    stack = [root]
+    while stack:
+        for e in os.scandir(stack.pop()):
+            if e.is_dir(follow_symlinks=False):
+                if e.name not in ("logs", ".build"):
+                    stack.append(e.path)
+            elif e.stat(follow_symlinks=False).st_mtime_ns >= start_ns:
+                n += 1
+    return n
+
+def run_stage(root: str, name: str, cmd: list[str], env: dict) -> dict:
+    log = os.path.join(root, "logs", f"{name}.log")
+    start_ns = time.time_ns()
+    t0 = time.perf_counter()
+    with open(log, "wb") as out:
+        p = subprocess.Popen([sys.executable, os.path.join(TOOLS, cmd[0]), *cmd[1:]],
+                             cwd=root, env=env, stdout=out, stderr=subprocess.STDOUT)
+        # wait4 gives this child's own rusage (ru_maxrss is KiB on Linux)
+        _, status, usage = os.wait4(p.pid, 0)
+        p.returncode = os.waitstatus_to_exitcode(status)
+    seconds = time.perf_counter() - t0
+    return {
+        "stage": name,
+        "command": " ".join(["tools/" + cmd[0], *cmd[1:]]),
+        "exitCode": p.returncode,
+        "seconds": round(seconds, 4),
+        "peakRssKiB": usage.ru_maxrss,
+        "filesWritten": files_since(root, start_ns),
+        "log": os.path.relpath(log, root),
+    }
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark the build/verify pipeline on a synthetic registry.")
+    ap.add_argument("--size", default="1k", help="1k, 100k, 1m or a record count (default 1k)")
+    ap.add_argument("--jobs", type=int, default=0, help="--jobs passed to stages that take it (0 = all cores)")
+    ap.add_argument("--stages", default=",".join(DEFAULT_STAGES), help="comma-separated stage list")
+    ap.add_argument("--out", help="results file (default .build/bench/results-<N>.json)")
+    ap.add_argument("--dir", help="scratch directory (default .build/bench/registry-<N>)")
+    ap.add_argument("--keep", action="store_true", help="keep the scratch directory afterwards")
+    args = ap.parse_args()
+
+    n = parse_size(args.size)
+    cmds = stage_cmds(args.jobs)
+    stages = [s for s in args.stages.split(",") if s]
+    unknown = [s for s in stages if s not in cmds]
+    if unknown:
+        raise SystemExit(f"FAIL: unknown stage(s): {', '.join(unknown)} (known: {', '.join(cmds)})")
+
+    root = os.path.abspath(args.dir or os.path.join(REPO, ".build", "bench", f"registry-{n}"))
+    out = args.out or os.path.join(REPO, ".build", "bench", f"results-{n}.json")
+    shutil.rmtree(root, ignore_errors=True)
+    os.makedirs(os.path.join(root, "logs"))
+
+    t0 = time.perf_counter()
+    generate(root, n)
+    gen_seconds = time.perf_counter() - t0
+    print(f"OK: generated {n} records in {gen_seconds:.2f}s -> {root}")
+
+    env = dict(os.environ)
+    server = None
+    if "verify-manifest" in stages:
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        server = subprocess.Popen([sys.executable, "-m", "http.server", str(port), "--bind", "127.0.0.1"],
+                                  cwd=root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for _ in range(50):  # wait until it accepts connections
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+        env["REGISTRY_BASE"] = f"http://127.0.0.1:{port}"
+        env["REGISTRY_HTTP_CACHE"] = "off"
+
+    results = []
+    try:
+        for name in stages:
+            r = run_stage(root, name, cmds[name], env)
+            results.append(r)
+            status = "OK" if r["exitCode"] == 0 else "FAIL"
+            print(f"{status}: {name:<24} {r['seconds']:>9.3f}s  rss={r['peakRssKiB']:>8} KiB  files={r['filesWritten']}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    write_json(out, {
+        "size": n,
+        "jobs": args.jobs or os.cpu_count(),
+        "generatedAt": datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpuCount": os.cpu_count(),
+        "generateSeconds": round(gen_seconds, 4),
+        "stages": results
+    })
+    print(f"OK: wrote {out}")
+    if not args.keep:
+        shutil.rmtree(root, ignore_errors=True)
+    return 0 if all(r["exitCode"] == 0 for r in results) else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
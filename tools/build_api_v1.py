@@ -1,37 +1,93 @@
 #!/usr/bin/env python3
-import json, glob, os, hashlib
+import glob, os, sys
+from itertools import groupby
 from datetime import datetime, timezone
 
-BASE = "https://napier369.github.io/registry.parasks"
-PLACEHOLDER = "sha256:REPLACED_AT_RUNTIME"
+from registry_core import (SHARD_SIZE, add_terms, iter_lines, list_ids, load_json, new_index, output_txn, pop_jobs,
+                           profile, remove_file, root_hash, seal_terms_ids, shard_hash, shard_key, sorted_index,
+                           unsynced, write_bin_manifest, write_export, write_json, write_json_stream)
+from registry_core.ids import INDEX_PATH
+from registry_core.search import KEY_CHARS, KINDS
 
-def canonical_placeholder_sorted_min(obj: dict) -> bytes:
-    # v1 sealed hash rule: placeholder allowed, sorted keys, min separators, utf-8
-    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+BASE = "https://napier369.github.io/registry.parasks"
 
-def sha256_hex(b: bytes) -> str:
-    return hashlib.sha256(b).hexdigest()
+# Incremental build state (local only, never published)
+STATE_PATH = ".build/api_v1_state.json"
+STATE_VERSION = 1
 
-def load_json(path: str) -> dict:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+# Bulk download: every record + sealed hash, one NDJSON line each
+EXPORT_PATH = "api/v1/export/registry.ndjson.gz"
 
-def write_json(path: str, obj: dict):
-    d = os.path.dirname(path)
-    if d:
-        os.makedirs(d, exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(obj, f, indent=2, ensure_ascii=False)
-        f.write("\n")
+# Inverted tag / label-word index, one small file per term key
+SEARCH_DIR = "api/v1/search"
 
 def ensure_leading_slash(p: str) -> str:
     if not p:
         return p
     return p if p.startswith("/") else ("/" + p)
 
-def main():
-    # Collect IDs from /data/*.jsonld
-    ids = sorted([os.path.splitext(os.path.basename(p))[0] for p in glob.glob("data/*.jsonld")])
+def load_state(path: str) -> dict:
+    try:
+        st = load_json(path)
+    except (FileNotFoundError, ValueError):
+        return {}
+    if st.get("version") != STATE_VERSION:
+        return {}
+    return st
+
+def record_item(rid: str) -> dict:
+    return {
+        "id": rid,
+        "data": f"/data/{rid}.jsonld",
+        "page": f"/page/{rid}/",
+        "resolver": f"/id/{rid}/"
+    }
+
+def manifest_item(rid: str, sealed_ch: str) -> dict:
+    return {
+        "data": f"/data/{rid}.jsonld",
+        "contentHash": sealed_ch
+    }
+
+def write_search(index: dict) -> None:
+    # index: sorted_index() postings, {kind: {KEY: {term: [IDs]}}}
+    for kind, field in KINDS.items():
+        d = f"{SEARCH_DIR}/{kind}"
+        # A key that lost all its terms is deleted (clients treat 404 as no match), not left stale
+        for p in glob.glob(f"{d}/*.json"):
+            if os.path.splitext(os.path.basename(p))[0] not in index[kind]:
+                remove_file(p)
+        for key in index[kind]:
+            write_json(f"{d}/{key}.json", {
+                "apiVersion": "v1",
+                "key": key,
+                field: index[kind][key]
+            })
+    write_json(f"{SEARCH_DIR}/index.json", {
+        "apiVersion": "v1",
+        "base": BASE,
+        "termKey": f"first {KEY_CHARS} characters of the lowercased term ('_' if not [a-z0-9])",
+        "templates": {kind: f"/{SEARCH_DIR}/{kind}/{{KEY}}.json" for kind in KINDS},
+        # key -> number of terms in that shard
+        "shards": { kind: { key: len(v) for key, v in index[kind].items() } for kind in KINDS }
+    })
+
+def build(argv: list[str]) -> int:
+    jobs = pop_jobs(argv)
+    incremental = "--incremental" in argv
+    # Minimal separators for records/index/manifest (default output matches indent=2)
+    compact = "--compact" in argv
+
+    # Issued IDs from manifests/ids.json (no scan of data/); release_api_v1.sh syncs it first.
+    # --check-ids opts into one listdir of data/ to refuse an index that lags it (reg_check_all does the same)
+    with profile.stage("ids"):
+        ids = list_ids()
+        stale = unsynced(ids) if "--check-ids" in argv and os.path.isfile(INDEX_PATH) else []
+    for rid in stale:
+        print(f"FAIL: data/{rid}.jsonld is not synced into {INDEX_PATH}; run python3 tools/reg_ids.py sync")
+    if stale:
+        return 1
+    profile.count("ids", len(ids))
 
     # Audit pointer/index (latest may be stored as relative; normalize for API)
     audit_idx = load_json("audit/logs/index.json")
@@ -40,64 +96,207 @@ def main():
     # Timestamp for generated files
     now = datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
+    state = load_state(STATE_PATH) if incremental else {}
+    prev_recs = state.get("records", {})
+    # Bundles embed latestAudit, so a new audit entry invalidates all of them
+    prev_audit = state.get("latestAudit")
+    new_recs = {}
+
     # 1) records.json (list form)
-    records_list = []
-    for rid in ids:
-        records_list.append({
-            "id": rid,
-            "data": f"/data/{rid}.jsonld",
-            "page": f"/page/{rid}/",
-            "resolver": f"/id/{rid}/"
-        })
-    write_json("api/v1/records.json", {
+    #    records/index/manifest are streamed from the ID list, never built in memory
+    write_json_stream("api/v1/records.json", {
         "apiVersion": "v1",
-        "base": BASE,
-        "records": records_list
-    })
+        "base": BASE
+    }, "records", (record_item(rid) for rid in ids), mapping=False, compact=compact)
 
     # 2) index.json (map form + pointers)
-    write_json("api/v1/index.json", {
+    write_json_stream("api/v1/index.json", {
         "apiVersion": "v1",
         "base": BASE,
         "latestAudit": "/audit/logs/index.json",
-        "wikiIndex": "/api/v1/wiki.json",
-        "records": { rid: f"/data/{rid}.jsonld" for rid in ids }
+        "wikiIndex": "/api/v1/wiki.json"
+    }, "records", ((rid, f"/data/{rid}.jsonld") for rid in ids), compact=compact)
+
+    # 3) One pass over the ID shards, in ID order: seal (in incremental mode only records whose
+    #    mtime/size changed), then write each shard's Merkle leaves, shard files and bundles and
+    #    add its search postings. Only the shard in hand is held as maps; registry-wide the build
+    #    keeps the ID list, one packed digest per ID and the search postings.
+    if incremental:
+        todo = []
+        for rid in ids:
+            st = os.stat(f"data/{rid}.jsonld")
+            prev = prev_recs.get(rid)
+            if not (prev and prev.get("mtimeNs") == st.st_mtime_ns and prev.get("size") == st.st_size
+                    and "terms" in prev):
+                todo.append(rid)
+            new_recs[rid] = {"mtimeNs": st.st_mtime_ns, "size": st.st_size}
+    else:
+        todo = ids
+    profile.count("resealed", len(todo))
+    fresh = seal_terms_ids(todo, jobs=jobs)
+    resealed = set(todo) if incremental else None
+
+    def sealed_records():
+        # (ID, sealed hash, search terms): resealed records from the pool, the rest from the state
+        for rid in ids:
+            if resealed is None or rid in resealed:
+                with profile.stage("build.seal"):
+                    _, ch, terms = next(fresh)
+            else:
+                ch, terms = prev_recs[rid]["contentHash"], prev_recs[rid]["terms"]
+            yield rid, ch, terms
+
+    digests = bytearray()  # 32 raw bytes per ID, in ID order
+    postings = new_index()
+    merkle_dir, shard_dir = {}, {}
+    # A removed ID changes the export too
+    any_changed = bool(set(prev_recs) - set(ids))
+    written = 0
+    for key, group in groupby(sealed_records(), key=lambda r: shard_key(r[0])):
+        sealed = {}
+        changed = set()
+        for rid, ch, terms in group:
+            sealed[rid] = ch
+            digests += bytes.fromhex(ch.split("sha256:", 1)[-1])
+            add_terms(postings, rid, terms)
+            if prev_recs.get(rid, {}).get("contentHash") != ch:
+                changed.add(rid)
+            if incremental:
+                new_recs[rid].update(contentHash=ch, terms=terms)
+        any_changed = any_changed or bool(changed)
+        sids = list(sealed)
+
+        # 3a) Merkle shard (rewritten only when its leaves changed)
+        with profile.stage("build.merkle"):
+            h = shard_hash(sealed)
+        write_json(f"api/v1/merkle/{key}.json", {
+            "apiVersion": "v1",
+            "shard": key,
+            "hash": h,
+            "records": sealed
+        })
+        merkle_dir[key] = {"hash": h, "count": len(sids), "path": f"/api/v1/merkle/{key}.json"}
+
+        # 3b) sharded records/index/manifest: one small file set per shard plus a directory,
+        #     so a lookup touches /api/v1/shards/{SHARD}/... instead of the full registry
+        write_json(f"api/v1/shards/{key}/records.json", {
+            "apiVersion": "v1",
+            "base": BASE,
+            "shard": key,
+            "records": [record_item(rid) for rid in sids]
+        })
+        write_json(f"api/v1/shards/{key}/index.json", {
+            "apiVersion": "v1",
+            "base": BASE,
+            "shard": key,
+            "latestAudit": "/audit/logs/index.json",
+            "records": { rid: f"/data/{rid}.jsonld" for rid in sids }
+        })
+        write_json(f"api/v1/shards/{key}/manifest.json", {
+            "apiVersion": "v1",
+            "base": BASE,
+            "shard": key,
+            "latestAudit": "/audit/logs/index.json",
+            "records": { rid: manifest_item(rid, sealed[rid]) for rid in sids }
+        })
+        shard_dir[key] = {"count": len(sids), "first": sids[0], "last": sids[-1]}
+
+        # 3c) bundles (MUST use sealed hash from manifest; NEVER use placeholder from /data)
+        for rid in sids:
+            out = f"api/v1/bundle/{rid}.json"
+            if incremental and rid not in changed and prev_audit == latest_audit and os.path.isfile(out):
+                continue
+            written += write_json(out, {
+                "apiVersion": "v1",
+                "base": BASE,
+                "id": rid,
+                "resolver": f"/id/{rid}/",
+                "page": f"/page/{rid}/",
+                "data": f"/data/{rid}.jsonld",
+                "contentHash": sealed[rid],
+                "latestAuditPointer": "/audit/logs/index.json",
+                "latestAudit": latest_audit
+            })
+
+    def sealed_pairs():
+        # (ID, sealed contentHash) in ID order, rebuilt from the packed digests
+        for i, rid in enumerate(ids):
+            yield rid, "sha256:" + digests[i * 32:(i + 1) * 32].hex()
+
+    # 4) manifest (sealed hashes of canonical bytes, using placeholder rule), streamed
+    write_json_stream("api/v1/manifest.json", {
+        "apiVersion": "v1",
+        "base": BASE,
+        "latestAudit": "/audit/logs/index.json"
+    }, "records", ((rid, manifest_item(rid, ch)) for rid, ch in sealed_pairs()), compact=compact)
+
+    # 4a) binary manifest: sorted fixed-width ID + digest records for mmap/binary search
+    write_bin_manifest("api/v1/manifest.bin", sealed_pairs())
+
+    # 4b) Merkle root; a shard key with no IDs left is deleted, not left serving its old leaves
+    for p in glob.glob("api/v1/merkle/*.json"):
+        key = os.path.splitext(os.path.basename(p))[0]
+        if key != "root" and key not in merkle_dir:
+            remove_file(p)
+    write_json("api/v1/merkle/root.json", {
+        "apiVersion": "v1",
+        "base": BASE,
+        "manifest": "/api/v1/manifest.json",
+        "algorithm": "sha256; see tools/registry_core/merkle.py",
+        "root": root_hash({key: m["hash"] for key, m in merkle_dir.items()}),
+        "shards": merkle_dir
     })
 
-    # 3) manifest (sealed hashes of canonical bytes, using placeholder rule)
-    manifest_recs = {}
-    for rid in ids:
-        obj = load_json(f"data/{rid}.jsonld")
-        # enforce placeholder presence to match v1 rule
-        obj["contentHash"] = PLACEHOLDER
-        sealed = sha256_hex(canonical_placeholder_sorted_min(obj))
-        manifest_recs[rid] = {
-            "data": f"/data/{rid}.jsonld",
-            "contentHash": f"sha256:{sealed}"
-        }
-    write_json("api/v1/manifest.json", {
+    # 4c) shard directory, likewise dropping shards with no IDs left
+    for d in glob.glob("api/v1/shards/*/"):
+        if os.path.basename(os.path.dirname(d)) not in shard_dir:
+            for name in ("records.json", "index.json", "manifest.json"):
+                remove_file(os.path.join(d, name))
+    write_json("api/v1/shards.json", {
         "apiVersion": "v1",
         "base": BASE,
-        "latestAudit": "/audit/logs/index.json",
-        "records": manifest_recs
+        "shardKey": "ID prefix letter + first 3 digits (E000003 -> E000)",
+        "shardSize": SHARD_SIZE,
+        "templates": {
+            "records": "/api/v1/shards/{SHARD}/records.json",
+            "index": "/api/v1/shards/{SHARD}/index.json",
+            "manifest": "/api/v1/shards/{SHARD}/manifest.json"
+        },
+        "shards": shard_dir
     })
 
-    # 4) bundles (MUST use sealed hash from manifest; NEVER use placeholder from /data)
-    for rid in ids:
-        sealed_ch = manifest_recs[rid]["contentHash"]
-        write_json(f"api/v1/bundle/{rid}.json", {
-            "apiVersion": "v1",
-            "base": BASE,
-            "id": rid,
-            "resolver": f"/id/{rid}/",
-            "page": f"/page/{rid}/",
-            "data": f"/data/{rid}.jsonld",
-            "contentHash": sealed_ch,
-            "latestAuditPointer": "/audit/logs/index.json",
-            "latestAudit": latest_audit
+    # 4d) search index from the postings gathered above
+    with profile.stage("build.search"):
+        write_search(sorted_index(postings))
+
+    # 4e) bundles of IDs no longer issued are deleted, like stale Merkle and shard files
+    issued = set(ids)
+    for p in glob.glob("api/v1/bundle/*.json"):
+        if os.path.splitext(os.path.basename(p))[0] not in issued:
+            remove_file(p)
+
+    # 5) NDJSON export (streamed record by record; skipped when nothing changed)
+    if not (incremental and not any_changed and os.path.isfile(EXPORT_PATH)):
+        with profile.stage("build.export"):
+            write_export(EXPORT_PATH, iter_lines(sealed_pairs()))
+
+    if incremental:
+        write_json(STATE_PATH, {
+            "version": STATE_VERSION,
+            "latestAudit": latest_audit,
+            "records": new_recs
         })
+        print(f"OK: built api/v1 incrementally (ids={len(ids)} resealed={len(todo)} bundles={written})")
+        return 0
 
     print(f"OK: built api/v1 (ids={len(ids)})")
+    return 0
+
+def main(argv: list[str]) -> int:
+    profile.setup(argv, "build_api_v1")
+    # Everything is staged under .build/staging and swapped in only once the build succeeded
+    with output_txn(), profile.stage("build.total"):
+        return build(argv)
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(main(sys.argv[1:]))
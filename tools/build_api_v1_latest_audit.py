@@ -1,27 +1,19 @@
 #!/usr/bin/env python3
-import json
 from datetime import datetime, timezone
 
-BASE = "https://napier369.github.io/registry.parasks"
-
-def load(p):
-    with open(p, "r", encoding="utf-8") as f:
-        return json.load(f)
+from registry_core import load_json, write_json
 
-def write(p, obj):
-    with open(p, "w", encoding="utf-8") as f:
-        json.dump(obj, f, indent=2, ensure_ascii=False)
-        f.write("\n")
+BASE = "https://napier369.github.io/registry.parasks"
 
 def main():
-    idx = load("audit/logs/index.json")
+    idx = load_json("audit/logs/index.json")
     latest = idx.get("latest")
     if not latest:
         raise SystemExit("FAIL: audit/logs/index.json has no 'latest'")
 
     now = datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00","Z")
 
-    write("api/v1/latest-audit.json", {
+    write_json("api/v1/latest-audit.json", {
         "apiVersion": "v1",
         "base": BASE,
         "generatedAt": now,
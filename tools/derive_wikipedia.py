@@ -7,111 +7,195 @@ Derive structured signals from Wikipedia (API only) and emit:
 
 Usage:
   python3 tools/derive_wikipedia.py "Albert Einstein" E000003
+  python3 tools/derive_wikipedia.py --batch titles.tsv [--workers 4] [--max-age-hours 24]
+
+Batch files hold one "Title<TAB>ID" per line (blank lines and # comments are
+ignored). Titles are queried up to MAX_TITLES per request with bounded
+concurrency, category continuation is followed, and a cached
+sources/raw/wikipedia/{slug}/query.json younger than --max-age-hours is
+reused instead of refetching (a redirected title's slug holds a
+redirect.json pointing at the resolved slug). A cache hit leaves query.json
+untouched, so its age keeps counting, and the record's retrievedAt/issuedAt
+are the cached file's retrieval time rather than now. A request that fails only
+fails the titles in its chunk.
+
+Each ID is claimed in manifests/ids.json before its record is written and
+marked issued after: a new ID is reserved, an issued one is refreshed, and a
+retired (or issued-then-removed) one is refused, since reuse is forbidden.
 """
 
 from __future__ import annotations
 
+import http.client
 import json
+import os
 import re
 import sys
+import time
 import urllib.parse
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
+from registry_core import HttpClient, locked_index, slugify
 
-WIKI_API = "https://en.wikipedia.org/w/api.php"
+
+WIKI_API = os.environ.get("WIKI_API", "https://en.wikipedia.org/w/api.php")
 WIKI_PAGE_BASE = "https://en.wikipedia.org/wiki/"
+RAW_ROOT = Path("sources/raw/wikipedia")
+
+# MediaWiki caps titles= at 50 per request for regular clients
+MAX_TITLES = 50
+
+# Raw responses are our provenance cache; no HTTP-level cache on top
+CLIENT = HttpClient(user_agent="registry.parasks derivation bot (contact: local) Python urllib", cache=None)
 
 def http_get_json(url: str) -> dict:
-    req = urllib.request.Request(
-        url,
-        headers={
-            "User-Agent": "registry.parasks derivation bot (contact: local) Python urllib",
-            "Accept": "application/json",
-        },
-    )
-    with urllib.request.urlopen(req, timeout=30) as resp:
-        data = resp.read().decode("utf-8")
-    return json.loads(data)
-
-def slugify(title: str) -> str:
-    # For filenames/paths only (not identifiers)
-    s = title.strip().lower()
-    s = re.sub(r"[^a-z0-9]+", "-", s).strip("-")
-    return s or "page"
+    return CLIENT.request(url, {"Accept": "application/json"}).json()
 
-def derive_tags(title: str, categories: list[str]) -> list[str]:
-    tags: set[str] = set()
+# Tag derivation: tokenizers are compiled once and the normalisation rules
+# (stopwords, minimum lengths, implied tags) live in tools/tag_rules.json.
+TAG_RULES_PATH = Path(__file__).with_name("tag_rules.json")
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+TOKEN_OR_NL_RE = re.compile(r"[a-z0-9]+|\n")
+_RULES = None
+
+def tag_rules() -> dict:
+    global _RULES
+    if _RULES is None:
+        r = json.loads(TAG_RULES_PATH.read_text(encoding="utf-8"))
+        _RULES = {
+            "minTitle": r.get("minTitleTokenLength", 3),
+            "minCategory": r.get("minCategoryTokenLength", 4),
+            "stopwords": frozenset(r.get("stopwords", [])),
+            "implies": {k: tuple(v) for k, v in r.get("implies", {}).items()},
+        }
+    return _RULES
 
-    # Title keywords
-    for tok in re.findall(r"[A-Za-z0-9]+", title.lower()):
-        if len(tok) >= 3:
-            tags.add(tok)
+def _title_tags(title: str, rules: dict) -> set[str]:
+    return {tok for tok in TOKEN_RE.findall(title.lower()) if len(tok) >= rules["minTitle"]}
 
-    # Category keywords (strip "Category:" and simplify)
-    for c in categories:
-        c = c.replace("Category:", "").lower()
-        c = re.sub(r"[^a-z0-9 ]+", " ", c)
-        for tok in c.split():
-            if len(tok) >= 4 and tok not in {"from", "with", "that", "this", "their"}:
-                tags.add(tok)
+def _category_tags(text: str, rules: dict) -> list[str]:
+    # Strip "Category:", keep [a-z0-9] runs
+    text = text.replace("Category:", "").lower()
+    return [tok for tok in TOKEN_RE.findall(text) if len(tok) >= rules["minCategory"] and tok not in rules["stopwords"]]
 
+def _implied(tags: set[str], rules: dict) -> list[str]:
     # Small normalisations
-    if "einstein" in tags:
-        tags.add("relativity")
-        tags.add("physics")
-
+    for tok, extra in rules["implies"].items():
+        if tok in tags:
+            tags.update(extra)
     return sorted(tags)
 
-def main() -> int:
-    if len(sys.argv) < 3:
-        print('USAGE: python3 tools/derive_wikipedia.py "Albert Einstein" E000003', file=sys.stderr)
-        return 2
+def derive_tags(title: str, categories: list[str]) -> list[str]:
+    rules = tag_rules()
+    tags = _title_tags(title, rules)
+    # All categories of the page in one pass
+    tags.update(_category_tags("\n".join(categories), rules))
+    return _implied(tags, rules)
 
-    title = sys.argv[1]
-    out_id = sys.argv[2].strip().upper()
+def derive_tags_batch(pages: list[tuple[str, list[str]]]) -> list[list[str]]:
+    """
+    (title, categories) per page -> tags per page, same order.
 
-    # Timestamp for provenance
-    retrieved = datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+    Pages of a batch share many of their categories (maintenance and
+    "Living people"-style ones especially): the distinct categories of the
+    whole batch are tokenized together in one regex pass, each becomes a
+    token set, and pages union the sets of their categories. That only pays
+    off when categories repeat (measured break-even: about one distinct
+    category per four occurrences, tools/bench_derive_tags.py); below that
+    pages go through derive_tags one by one.
+    """
+    rules = tag_rules()
+    min_cat, stop = rules["minCategory"], rules["stopwords"]
+    distinct = list(dict.fromkeys(c for _, cats in pages for c in cats))
+    if 4 * len(distinct) > sum(len(cats) for _, cats in pages):
+        return [derive_tags(title, cats) for title, cats in pages]
+    text = "\n".join(distinct).replace("Category:", "").lower()
+    cat_tags: dict[str, frozenset[str]] = {}
+    i, cur = 0, []
+    for tok in TOKEN_OR_NL_RE.findall(text):
+        if tok == "\n":
+            cat_tags[distinct[i]] = frozenset(cur)
+            i, cur = i + 1, []
+        elif len(tok) >= min_cat and tok not in stop:
+            cur.append(tok)
+    if distinct:
+        cat_tags[distinct[i]] = frozenset(cur)
 
+    out = []
+    for title, cats in pages:
+        tags = _title_tags(title, rules)
+        tags.update(*(cat_tags[c] for c in cats))
+        out.append(_implied(tags, rules))
+    return out
+
+def query_params(titles: list[str]) -> dict:
     # Query: page info + revision id + categories
-    params = {
+    return {
         "action": "query",
         "format": "json",
         "formatversion": "2",
         "redirects": "1",
-        "titles": title,
+        "titles": "|".join(titles),
         "prop": "info|categories|pageprops",
         "cllimit": "500",
         "inprop": "url",
         # pageprops often contains wikibase_item (QID) when present
     }
-    url = WIKI_API + "?" + urllib.parse.urlencode(params)
-    raw = http_get_json(url)
 
-    pages = raw.get("query", {}).get("pages", [])
-    if not pages or pages[0].get("missing"):
-        raise SystemExit(f"FAIL: page not found: {title}")
+def query_pages(titles: list[str]) -> tuple[dict, dict]:
+    """
+    Query up to MAX_TITLES titles, following `continue` until categories are complete.
+
+    Returns ({resolved title: page}, {requested title: resolved title}).
+    """
+    params = query_params(titles)
+    pages: dict[str, dict] = {}
+    aliases: dict[str, str] = {}
+    while True:
+        raw = http_get_json(WIKI_API + "?" + urllib.parse.urlencode(params))
+        q = raw.get("query", {})
+        for m in q.get("normalized", []) + q.get("redirects", []):
+            aliases[m["from"]] = m["to"]
+        for p in q.get("pages", []):
+            have = pages.setdefault(p.get("title"), p)
+            if have is not p:
+                # later continuation batches only add categories
+                have.setdefault("categories", []).extend(p.get("categories", []))
+        if "continue" not in raw:
+            break
+        params = {**query_params(titles), **raw["continue"]}
+
+    resolved = {}
+    for t in titles:
+        r = t
+        for _ in range(3):  # normalized -> redirect chains are short
+            r = aliases.get(r, r)
+        resolved[t] = r
+    return pages, resolved
 
-    page = pages[0]
+def query_chunk(titles: list[str]) -> tuple[dict, dict] | Exception:
+    # For the batch pool: a failed chunk is returned, not raised, so the other chunks survive
+    try:
+        return query_pages(titles)
+    except (OSError, ValueError, http.client.HTTPException) as e:
+        return e
+
+def page_categories(page: dict) -> list[str]:
+    return [c.get("title") for c in page.get("categories", []) if c.get("title")]
+
+def build_record(page: dict, title: str, out_id: str, retrieved: str, tags: list[str] | None = None) -> dict:
     resolved_title = page.get("title", title)
     pageid = page.get("pageid")
     fullurl = page.get("fullurl") or (WIKI_PAGE_BASE + urllib.parse.quote(resolved_title.replace(" ", "_")))
     qid = (page.get("pageprops") or {}).get("wikibase_item")
 
-    categories = [c.get("title") for c in page.get("categories", []) if c.get("title")]
-    tags = derive_tags(resolved_title, categories)
-
-    # Outputs
-    slug = slugify(resolved_title)
-    raw_dir = Path("sources/raw/wikipedia") / slug
-    raw_dir.mkdir(parents=True, exist_ok=True)
-
-    (raw_dir / "query.json").write_text(json.dumps(raw, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    if tags is None:
+        tags = derive_tags(resolved_title, page_categories(page))
 
     # Registry JSON-LD (NO copied prose; only derived signals + provenance)
-    record = {
+    return {
         "@context": "https://registry.parasks/ontology/v1/context.jsonld",
         "@id": f"https://registry.parasks/id/{out_id}",
         "@type": "Entity",
@@ -129,12 +213,180 @@ def main() -> int:
         }
     }
 
+def write_outputs(raw: dict | None, record: dict, out_id: str, requested: str | None = None) -> tuple[Path, Path]:
+    # raw None: the page came from the cache, whose query.json (and mtime) must stay as retrieved
+    slug = slugify(record["rdfs:label"]["en"])
+    raw_dir = RAW_ROOT / slug
+    raw_dir.mkdir(parents=True, exist_ok=True)
+    if raw is not None:
+        (raw_dir / "query.json").write_text(json.dumps(raw, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    if requested is not None and slugify(requested) != slug:
+        # Redirected/normalized title: point its slug at the resolved one so cached_page finds it
+        alias_dir = RAW_ROOT / slugify(requested)
+        alias_dir.mkdir(parents=True, exist_ok=True)
+        alias = {"from": requested, "to": slug}
+        (alias_dir / "redirect.json").write_text(json.dumps(alias, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
     out_path = Path("data") / f"{out_id}.jsonld"
     out_path.parent.mkdir(parents=True, exist_ok=True)
     out_path.write_text(json.dumps(record, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return out_path, raw_dir / "query.json"
+
+def claim_ids(out_ids: list[str]) -> dict[str, str]:
+    """
+    Reserve the IDs about to be written in manifests/ids.json (one lock for
+    all of them); returns {ID: reason} for the ones that must not be written.
+    """
+    refused = {}
+    with locked_index() as index:
+        for rid in out_ids:
+            try:
+                issued = index.taken(rid) and rid not in index.reserved and rid not in index.retired
+                if issued and not os.path.isfile(f"data/{rid}.jsonld"):
+                    # Issued, then removed: sync retires it, so writing it again would be reuse
+                    raise ValueError(f"{rid} was issued and its data/ file removed (reuse is forbidden)")
+                index.claim([rid], "derive_wikipedia")
+            except ValueError as e:
+                refused[rid] = str(e)
+    return refused
+
+def issue_ids(out_ids: list[str]) -> None:
+    if out_ids:
+        with locked_index() as index:
+            index.issue(out_ids)
+
+def iso_time(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+def cached_page(title: str, max_age: float) -> tuple[dict, str] | None:
+    """The cached page for title and when it was retrieved (query.json's mtime), if younger than max_age."""
+    slug = slugify(title)
+    try:
+        slug = json.loads((RAW_ROOT / slug / "redirect.json").read_text(encoding="utf-8"))["to"]
+    except (OSError, ValueError, KeyError):
+        pass
+    p = RAW_ROOT / slug / "query.json"
+    try:
+        mtime = p.stat().st_mtime
+        if time.time() - mtime > max_age:
+            return None
+        pages = json.loads(p.read_text(encoding="utf-8")).get("query", {}).get("pages", [])
+    except (OSError, ValueError):
+        return None
+    return (pages[0], iso_time(mtime)) if pages and not pages[0].get("missing") else None
+
+def read_batch(path: str) -> list[tuple[str, str]]:
+    items = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        title, _, out_id = line.rpartition("\t")
+        if not title:
+            raise SystemExit(f"FAIL: expected 'Title<TAB>ID' in {path}: {line!r}")
+        items.append((title.strip(), out_id.strip().upper()))
+    return items
+
+def batch(path: str, workers: int, max_age: float) -> int:
+    items = read_batch(path)
+    retrieved = iso_time(time.time())
+
+    pages: dict[str, dict] = {}
+    cached_at: dict[str, str] = {}
+    fresh = []
+    for title, _ in items:
+        hit = cached_page(title, max_age) if max_age > 0 else None
+        if hit is not None:
+            pages[title], cached_at[title] = hit
+        else:
+            fresh.append(title)
+
+    chunks = [fresh[i:i + MAX_TITLES] for i in range(0, len(fresh), MAX_TITLES)]
+    failed: dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        for chunk, result in zip(chunks, ex.map(query_chunk, chunks)):
+            if isinstance(result, Exception):
+                # One bad request only costs its own titles
+                failed.update((t, f"{type(result).__name__}: {result}") for t in chunk)
+                continue
+            got, resolved = result
+            for t, r in resolved.items():
+                if r in got and not got[r].get("missing"):
+                    pages[t] = got[r]
+
+    found = [(title, out_id) for title, out_id in items if title in pages]
+    tags = derive_tags_batch([(pages[t]["title"], page_categories(pages[t])) for t, _ in found])
+    tags_for = {t: tg for (t, _), tg in zip(found, tags)}
+
+    uses: dict[str, int] = {}
+    for _, out_id in found:
+        uses[out_id] = uses.get(out_id, 0) + 1
+    refused = {rid: f"{rid} is given to more than one title" for rid, n in uses.items() if n > 1}
+    refused.update(claim_ids(sorted(rid for rid in uses if rid not in refused)))
+
+    missing = 0
+    written = []
+    for title, out_id in items:
+        page = pages.get(title)
+        if title in failed:
+            print(f"FAIL: query failed for {title}: {failed[title]}")
+            continue
+        if page is None:
+            print(f"FAIL: page not found: {title}")
+            missing += 1
+            continue
+        if out_id in refused:
+            print(f"FAIL: {title}: {refused[out_id]}")
+            continue
+        # Per-page raw file keeps the single-title response shape; cache hits keep theirs
+        raw = None if title in cached_at else {"batchcomplete": True, "query": {"pages": [page]}}
+        record = build_record(page, title, out_id, cached_at.get(title, retrieved), tags_for[title])
+        out_path, _ = write_outputs(raw, record, out_id, title)
+        written.append(out_id)
+        print(f"OK: wrote {out_path}")
+    issue_ids(written)
+
+    print(f"OK: batch done (titles={len(items)} fetched={len(fresh)} cached={len(items) - len(fresh)} "
+          f"batches={len(chunks)} failed={len(failed)} missing={missing} refused={len(refused)})")
+    return 0 if missing == 0 and not failed and not refused else 1
+
+def main() -> int:
+    argv = sys.argv[1:]
+    if argv and argv[0] == "--batch":
+        import argparse
+        ap = argparse.ArgumentParser(prog="derive_wikipedia.py --batch")
+        ap.add_argument("--batch", required=True, help="file of 'Title<TAB>ID' lines")
+        ap.add_argument("--workers", type=int, default=4, help="concurrent API requests (default 4)")
+        ap.add_argument("--max-age-hours", type=float, default=24.0, help="reuse cached raw responses younger than this (0 = always refetch)")
+        args = ap.parse_args(argv)
+        return batch(args.batch, args.workers, args.max_age_hours * 3600)
+
+    if len(argv) < 2:
+        print('USAGE: python3 tools/derive_wikipedia.py "Albert Einstein" E000003', file=sys.stderr)
+        print('       python3 tools/derive_wikipedia.py --batch titles.tsv [--workers N] [--max-age-hours H]', file=sys.stderr)
+        return 2
+
+    title = argv[0]
+    out_id = argv[1].strip().upper()
+
+    # Timestamp for provenance
+    retrieved = iso_time(time.time())
+
+    url = WIKI_API + "?" + urllib.parse.urlencode(query_params([title]))
+    raw = http_get_json(url)
+
+    pages = raw.get("query", {}).get("pages", [])
+    if not pages or pages[0].get("missing"):
+        raise SystemExit(f"FAIL: page not found: {title}")
+
+    refused = claim_ids([out_id])
+    if refused:
+        raise SystemExit(f"FAIL: {refused[out_id]}")
+    out_path, raw_path = write_outputs(raw, build_record(pages[0], title, out_id, retrieved), out_id, title)
+    issue_ids([out_id])
 
     print(f"OK: wrote {out_path}")
-    print(f"OK: raw saved {raw_dir}/query.json")
+    print(f"OK: raw saved {raw_path}")
     return 0
 
 if __name__ == "__main__":
@@ -1,24 +1,16 @@
 #!/usr/bin/env python3
-import json
-import os
+import os, sys
 from datetime import datetime, timezone
 
+from registry_core import load_json, output_txn, profile, write_json
+
 BASE = "https://napier369.github.io/registry.parasks"
 OUT_DIR = "api/v1/bundle"
 MANIFEST_PATH = "api/v1/manifest.json"
 LATEST_AUDIT_PATH = "api/v1/latest-audit.json"
 
-def load_json(path: str) -> dict:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def write_json(path: str, obj: dict) -> None:
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(obj, f, indent=2, ensure_ascii=False)
-        f.write("\n")
-
 def main() -> int:
+    profile.setup(sys.argv)
     if not os.path.isfile(MANIFEST_PATH):
         raise SystemExit(f"FAIL: missing {MANIFEST_PATH}. Run your manifest generator first.")
 
@@ -31,6 +23,13 @@ def main() -> int:
 
     generated_at = datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
+    with output_txn():
+        count = write_bundles(records, latest_audit, generated_at)
+
+    print(f"OK: wrote {count} bundles into {OUT_DIR}/")
+    return 0
+
+def write_bundles(records: dict, latest_audit: dict | None, generated_at: str) -> int:
     count = 0
     for rid, meta in sorted(records.items()):
         # meta: { data: "/data/ID.jsonld", contentHash: "sha256:..." }
@@ -56,9 +55,7 @@ def main() -> int:
         out_path = os.path.join(OUT_DIR, f"{rid}.json")
         write_json(out_path, bundle)
         count += 1
-
-    print(f"OK: wrote {count} bundles into {OUT_DIR}/")
-    return 0
+    return count
 
 if __name__ == "__main__":
     raise SystemExit(main())
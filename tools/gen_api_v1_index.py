@@ -1,19 +1,12 @@
 #!/usr/bin/env python3
-import json, os, re
+import json
 from pathlib import Path
 
-BASE = "https://napier369.github.io/registry.parasks"
-
-data_dir = Path("data")
-records = {}
+from registry_core import list_ids
 
-pat = re.compile(r"^[A-Z]\d{6}\.jsonld$")
+BASE = "https://napier369.github.io/registry.parasks"
 
-for p in sorted(data_dir.glob("*.jsonld")):
-    if not pat.match(p.name):
-        continue
-    rid = p.stem
-    records[rid] = f"/data/{p.name}"
+records = {rid: f"/data/{rid}.jsonld" for rid in list_ids()}
 
 out = {
     "apiVersion": "v1",
@@ -1,16 +1,10 @@
 #!/usr/bin/env python3
-import hashlib, json
-from urllib.request import Request, urlopen
+import json
 
-BASE="https://napier369.github.io/registry.parasks"
+from registry_core import BASE, HttpClient, sha256_hex
 
 def get_text(url):
-    req = Request(url, headers={"User-Agent":"registry.parasks probe"})
-    with urlopen(req, timeout=30) as r:
-        return r.read().decode("utf-8")
-
-def sha256_hex(b: bytes) -> str:
-    return hashlib.sha256(b).hexdigest()
+    return HttpClient(user_agent="registry.parasks probe").get_bytes(url).decode("utf-8")
 
 def dump_sorted(obj, mode):
     if mode == "sorted_min":
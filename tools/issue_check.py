@@ -1,59 +1,69 @@
 #!/usr/bin/env python3
-import hashlib, json, re, sys
+import re, sys
 from pathlib import Path
 
-RID_RE = re.compile(r"^[A-Z]\d{6}$")
-
-def canon_bytes(obj: dict) -> bytes:
-    import json as _json
-    s = _json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
-    return s.encode("utf-8")
+from registry_core import PLACEHOLDER, IdIndex, hash_hex, load_json, pop_jobs, seal_ids
+from registry_core.ids import INDEX_PATH as ID_INDEX
 
-def sha256_hex(b: bytes) -> str:
-    return hashlib.sha256(b).hexdigest()
+RID_RE = re.compile(r"^[A-Z]\d{6}$")
+MANIFEST = Path("api/v1/manifest.json")
 
 def fail(msg: str):
     print("FAIL:", msg)
     raise SystemExit(2)
 
-def main():
-    if len(sys.argv) != 2 or not RID_RE.match(sys.argv[1].upper()):
-        fail("USAGE: python3 tools/issue_check.py E000004")
-
-    rid = sys.argv[1].upper()
-
-    data_path = Path("data") / f"{rid}.jsonld"
-    if not data_path.exists():
-        fail(f"missing {data_path}")
-
-    obj = json.loads(data_path.read_text(encoding="utf-8"))
+def expected_hash(rid: str, obj: dict, manifest: dict | None) -> str:
+    # Sealed records carry their own hash; placeholder records are sealed in the manifest
     ch = obj.get("contentHash", "")
+    if ch == PLACEHOLDER:
+        if manifest is None:
+            fail(f"missing {MANIFEST} (needed for placeholder record {rid})")
+        ch = manifest.get("records", {}).get(rid, {}).get("contentHash", "")
+        if not ch:
+            fail(f"{rid} not in {MANIFEST}")
     if not ch.startswith("sha256:"):
         fail("contentHash missing/invalid")
+    return hash_hex(ch)
 
-    expected = ch.split("sha256:", 1)[1].strip()
-    obj2 = dict(obj)
-    obj2["contentHash"] = "sha256:"
-    actual = sha256_hex(canon_bytes(obj2))
-    if actual != expected:
-        fail(f"contentHash mismatch expected={expected} actual={actual}")
-
-    page_path = Path("page") / rid / "index.html"
-    id_path = Path("id") / rid / "index.html"
-    if not page_path.exists():
-        fail(f"missing {page_path}")
-    if not id_path.exists():
-        fail(f"missing {id_path}")
+def main():
+    argv = sys.argv[1:]
+    jobs = pop_jobs(argv)
+    rids = [a.upper() for a in argv]
+    if not rids or not all(RID_RE.match(rid) for rid in rids):
+        fail("USAGE: python3 tools/issue_check.py [--jobs N] E000004 [E000005 ...]")
 
     audit_idx = Path("audit/logs/index.json")
     if not audit_idx.exists():
         fail("missing audit/logs/index.json")
 
-    print("OK:", rid)
-    print(" - data:", data_path)
-    print(" - page:", page_path)
-    print(" - id:  ", id_path)
-    print(" - hash:", expected)
+    manifest = load_json(str(MANIFEST)) if MANIFEST.exists() else None
+    # The generators only see IDs issued in the index
+    issued = set(IdIndex.load(ID_INDEX).ids()) if Path(ID_INDEX).exists() else None
+
+    expected = {}
+    for rid in rids:
+        data_path = Path("data") / f"{rid}.jsonld"
+        if not data_path.exists():
+            fail(f"missing {data_path}")
+        if issued is not None and rid not in issued:
+            fail(f"{rid} not issued in {ID_INDEX} (run tools/reg_ids.py sync)")
+        obj = load_json(str(data_path))
+        expected[rid] = expected_hash(rid, obj, manifest)
+
+        for p in (Path("page") / rid / "index.html", Path("id") / rid / "index.html"):
+            if not p.exists():
+                fail(f"missing {p} (render it with tools/render_pages.py {rid})")
+
+    for rid, ch in seal_ids(rids, jobs=jobs):
+        actual = hash_hex(ch)
+        if actual != expected[rid]:
+            fail(f"{rid} contentHash mismatch expected={expected[rid]} actual={actual}")
+
+        print("OK:", rid)
+        print(" - data:", Path("data") / f"{rid}.jsonld")
+        print(" - page:", Path("page") / rid / "index.html")
+        print(" - id:  ", Path("id") / rid / "index.html")
+        print(" - hash:", expected[rid])
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Read api/v1/manifest.bin and cross-check it against api/v1/manifest.json.
+
+Usage:
+  python3 tools/reg_binmanifest.py get <ID> [<ID> ...]
+  python3 tools/reg_binmanifest.py check
+
+get binary-searches the mmapped file (no parsing, O(log N) per ID).
+check verifies the header checksum and that both manifests list exactly
+the same IDs with the same sealed hashes.
+"""
+
+import sys
+
+from registry_core import BinManifest, load_json
+
+BIN = "api/v1/manifest.bin"
+JSON = "api/v1/manifest.json"
+
+def get(rids: list[str]) -> int:
+    missing = 0
+    with BinManifest(BIN) as bm:
+        for rid in rids:
+            ch = bm.get(rid.upper())
+            if ch is None:
+                print(f"FAIL: {rid.upper()} not in {BIN}")
+                missing += 1
+            else:
+                print(f"{rid.upper()} {ch}")
+    return 1 if missing else 0
+
+def check() -> int:
+    fails = 0
+    with BinManifest(BIN) as bm:
+        if not bm.verify():
+            print(f"FAIL: {BIN} checksum mismatch")
+            return 1
+        records = load_json(JSON).get("records", {})
+        seen = set()
+        for rid, ch in bm:
+            seen.add(rid)
+            want = records.get(rid, {}).get("contentHash")
+            if want != ch:
+                print(f"FAIL: {rid} binary={ch} json={want}")
+                fails += 1
+        for rid in sorted(set(records) - seen):
+            print(f"FAIL: {rid} missing from {BIN}")
+            fails += 1
+        n = len(bm)
+    if fails:
+        print(f"FAIL: {fails} mismatch(es)")
+        return 1
+    print(f"OK: {BIN} matches {JSON} ({n} records)")
+    return 0
+
+def main():
+    argv = sys.argv[1:]
+    if argv[:1] == ["check"] and len(argv) == 1:
+        return check()
+    if argv[:1] == ["get"] and len(argv) > 1:
+        return get(argv[1:])
+    print("USAGE: python3 tools/reg_binmanifest.py (get <ID> [<ID> ...] | check)", file=sys.stderr)
+    return 2
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Offline integrity check of the whole registry in one pass.
+
+Usage:
+  python3 tools/reg_check_all.py [--jobs N] [--out FILE]
+
+Walks data/, page/, id/, api/v1/bundle/, api/v1/resolve/ and
+api/v1/manifest.json once, then cross-checks every ID on a process pool
+(default: all cores):
+
+- data/{ID}.jsonld parses, its @id names the ID, and its contentHash is the
+  placeholder or its own sealed hash
+- page/{ID}/index.html and id/{ID}/index.html exist
+- the manifest and bundle carry the sealed hash; the bundle points at the
+  latest audit entry; the resolve file has the expected links
+- no page/id/bundle/resolve/manifest entry exists without a data record
+- api/v1/manifest.bin (if present) passes its checksum and lists the same
+  IDs and hashes as manifest.json
+- manifests/ids.json (if present) lists exactly the IDs in data/ as issued
+
+Prints a JSON report (failures + counts + timings); exit status 1 if any
+check failed. Use tools/issue_check.py for a quick look at single IDs.
+"""
+
+import argparse, glob, os, re, sys, time
+from concurrent.futures import ProcessPoolExecutor
+
+from registry_core import PLACEHOLDER, BinManifest, IdIndex, json_bytes, load_json, pop_jobs, profile, seal_obj, write_bytes
+from registry_core.ids import INDEX_PATH as ID_INDEX
+
+ID_BASE = "https://registry.parasks/id/"
+RID_RE = re.compile(r"^[A-Z]\d{6}$")
+
+def ids_in(pattern: str) -> set[str]:
+    # pattern has exactly one "*" standing for the ID; other names (page/api/) are not records
+    pre, post = pattern.split("*")
+    names = (p[len(pre):len(p) - len(post)] for p in glob.glob(pattern))
+    return {n for n in names if RID_RE.match(n)}
+
+def resolve_doc(rid: str) -> dict:
+    return {"id": rid, "resolver": f"/id/{rid}/", "page": f"/page/{rid}/", "data": f"/data/{rid}.jsonld"}
+
+def check_one(item: tuple) -> tuple[str, list[dict]]:
+    rid, in_manifest, latest_audit, have = item
+    fails = []
+    def fail(check: str, detail: str):
+        fails.append({"id": rid, "check": check, "detail": detail})
+
+    def load(check: str, path: str) -> dict | None:
+        # A malformed file is a failure of its check, never a crash of the whole run
+        try:
+            doc = load_json(path)
+        except ValueError as e:
+            fail(check, f"invalid JSON in {path}: {e}")
+            return None
+        if not isinstance(doc, dict):
+            fail(check, f"{path} is not a JSON object")
+            return None
+        return doc
+
+    rec = load("data", f"data/{rid}.jsonld")
+    if rec is None:
+        return rid, fails
+    if rec.get("@id") != ID_BASE + rid:
+        fail("data", f"@id is {rec.get('@id')!r}")
+    sealed = seal_obj(rec)
+    if rec.get("contentHash") not in (PLACEHOLDER, sealed):
+        fail("data", f"contentHash {rec.get('contentHash')} != sealed {sealed}")
+
+    for name in ("page", "id"):
+        if name not in have:
+            fail(name, f"missing {name}/{rid}/index.html")
+
+    if in_manifest is None:
+        fail("manifest", "not in api/v1/manifest.json")
+    else:
+        if in_manifest.get("contentHash") != sealed:
+            fail("manifest", f"contentHash {in_manifest.get('contentHash')} != sealed {sealed}")
+        if in_manifest.get("data") != f"/data/{rid}.jsonld":
+            fail("manifest", f"data is {in_manifest.get('data')!r}")
+
+    if "bundle" not in have:
+        fail("bundle", f"missing api/v1/bundle/{rid}.json")
+    elif (b := load("bundle", f"api/v1/bundle/{rid}.json")) is not None:
+        if b.get("contentHash") != sealed:
+            fail("bundle", f"contentHash {b.get('contentHash')} != sealed {sealed}")
+        if b.get("latestAudit") != latest_audit:
+            fail("bundle", f"latestAudit {b.get('latestAudit')} != {latest_audit}")
+        if b.get("id") != rid:
+            fail("bundle", f"id is {b.get('id')!r}")
+
+    if "resolve" not in have:
+        fail("resolve", f"missing api/v1/resolve/{rid}.json")
+    elif (r := load("resolve", f"api/v1/resolve/{rid}.json")) is not None:
+        for k, v in resolve_doc(rid).items():
+            if r.get(k) != v:
+                fail("resolve", f"{k} is {r.get(k)!r}, expected {v!r}")
+
+    return rid, fails
+
+def main(argv: list[str]) -> int:
+    profile.setup(argv)
+    jobs = pop_jobs(argv, default=0)
+    ap = argparse.ArgumentParser(prog="reg_check_all.py", description="Offline integrity check of the whole registry.")
+    ap.add_argument("--out", help="also write the JSON report to this file")
+    out = ap.parse_args(argv).out
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+
+    t0 = time.perf_counter()
+    ids = sorted(ids_in("data/*.jsonld"))
+    found = {
+        "page": ids_in("page/*/index.html"),
+        "id": ids_in("id/*/index.html"),
+        "bundle": ids_in("api/v1/bundle/*.json"),
+        "resolve": ids_in("api/v1/resolve/*.json"),
+    }
+    manifest = load_json("api/v1/manifest.json").get("records", {}) if os.path.isfile("api/v1/manifest.json") else {}
+    latest_audit = load_json("audit/logs/index.json").get("latest")
+    t_walk = time.perf_counter()
+
+    items = [(rid, manifest.get(rid), latest_audit, {k for k, s in found.items() if rid in s}) for rid in ids]
+    failures = []
+    if jobs == 1 or len(items) < 2:
+        for _, fails in map(check_one, items):
+            failures.extend(fails)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as ex:
+            for _, fails in ex.map(check_one, items, chunksize=max(1, len(items) // (jobs * 8))):
+                failures.extend(fails)
+
+    # Orphans: published artefacts for IDs that have no data record
+    known = set(ids)
+    for kind, have in [*found.items(), ("manifest", set(manifest))]:
+        for rid in sorted(have - known):
+            failures.append({"id": rid, "check": kind, "detail": "no data record for this ID"})
+
+    # The ID index the generators read must list exactly the records in data/
+    if os.path.isfile(ID_INDEX):
+        index = IdIndex.load(ID_INDEX)
+        listed = set(index.ids())
+        for rid in sorted(known - listed):
+            hint = "reserved; run tools/reg_ids.py sync" if rid in index.reserved else "not in the ID index; run tools/reg_ids.py sync"
+            failures.append({"id": rid, "check": "ids", "detail": hint})
+        for rid in sorted(listed - known):
+            failures.append({"id": rid, "check": "ids", "detail": "issued in the ID index but no data record"})
+
+    if os.path.isfile("api/v1/manifest.bin"):
+        with BinManifest("api/v1/manifest.bin") as bm:
+            if not bm.verify():
+                failures.append({"id": None, "check": "binmanifest", "detail": "checksum mismatch"})
+            listed = set()
+            for rid, ch in bm:
+                listed.add(rid)
+                if manifest.get(rid, {}).get("contentHash") != ch:
+                    failures.append({"id": rid, "check": "binmanifest", "detail": f"{ch} differs from manifest.json"})
+            for rid in sorted(set(manifest) - listed):
+                failures.append({"id": rid, "check": "binmanifest", "detail": "missing from manifest.bin"})
+    t_end = time.perf_counter()
+
+    report = {
+        "ok": not failures,
+        "counts": {"ids": len(ids), "failures": len(failures), "jobs": jobs},
+        "timings": {"walkSeconds": round(t_walk - t0, 4), "checkSeconds": round(t_end - t_walk, 4),
+                    "totalSeconds": round(t_end - t0, 4)},
+        "failures": failures,
+    }
+    b = json_bytes(report)
+    if out:
+        write_bytes(out, b)
+    sys.stdout.buffer.write(b)
+    return 0 if report["ok"] else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Allocate identifiers and list issued ones from manifests/ids.json.
+
+Usage:
+  python3 tools/reg_ids.py allocate E [N] [--note TEXT]   # reserve the next N E-numbers
+  python3 tools/reg_ids.py reserve X000007 [...] [--note TEXT]
+  python3 tools/reg_ids.py sync                           # after adding/removing data/ files
+  python3 tools/reg_ids.py list [E X ...]
+  python3 tools/reg_ids.py status
+
+allocate/reserve print the IDs they took; write data/{ID}.jsonld for each
+and run sync, which marks them issued (and registers any hand-added file).
+Numbers are never handed out twice - not after a record is removed nor
+after a reservation is abandoned. Concurrent allocate/reserve/sync runs
+serialize on a file lock, so parallel issuing jobs get distinct IDs.
+"""
+
+import sys
+
+from registry_core.ids import IdIndex, INDEX_PATH, list_ids, locked_index, scan_data
+
+USAGE = "USAGE: python3 tools/reg_ids.py (allocate PREFIX [N] | reserve ID [ID ...] | sync | list [PREFIX ...] | status) [--note TEXT]"
+
+def pop_note(argv: list[str]) -> str | None:
+    if "--note" not in argv:
+        return None
+    i = argv.index("--note")
+    if i + 1 >= len(argv):
+        raise ValueError("--note needs a value")
+    note = argv[i + 1]
+    del argv[i:i + 2]
+    return note
+
+def main():
+    argv = sys.argv[1:]
+    try:
+        note = pop_note(argv)
+        cmd, args = (argv[0], argv[1:]) if argv else (None, [])
+
+        if cmd == "list":
+            for rid in list_ids([p.upper() for p in args] or None):
+                print(rid)
+            return 0
+
+        if cmd == "status":
+            index = IdIndex.load()
+            for p in sorted(index.prefixes):
+                issued = len(index.ids([p]))
+                print(f"{p}: highWater={index.high[p]} issued={issued}")
+            print(f"reserved={len(index.reserved)} retired={len(index.retired)} ({INDEX_PATH})")
+            return 0
+
+        if cmd == "allocate" and len(args) in (1, 2):
+            with locked_index() as index:
+                taken = index.allocate(args[0].upper(), int(args[1]) if len(args) == 2 else 1, note)
+        elif cmd == "reserve" and args:
+            with locked_index() as index:
+                taken = index.reserve([a.strip().upper() for a in args], note)
+        elif cmd == "sync" and not args:
+            with locked_index() as index:
+                changes = index.sync(scan_data())
+            for kind, rids in changes.items():
+                if rids:
+                    print(f"{'WARN' if kind == 'retired' else 'OK'}: {kind} {len(rids)}: {' '.join(rids)}")
+            print(f"OK: {INDEX_PATH} in sync ({len(index.ids())} issued, {len(index.reserved)} reserved)")
+            return 0
+        else:
+            print(USAGE, file=sys.stderr)
+            return 2
+    except ValueError as e:
+        print(f"FAIL: {e}", file=sys.stderr)
+        return 1
+
+    for rid in taken:
+        print(rid)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
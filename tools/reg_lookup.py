@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+import sys, urllib.error
+
+from registry_core import BASE, HttpClient, shard_key
+
+SHARD_MANIFEST = "/api/v1/shards/{SHARD}/manifest.json"
+
+def main():
+    if len(sys.argv) < 2:
+        print("USAGE: python3 tools/reg_lookup.py E000004 [E000005 ...]", file=sys.stderr)
+        return 2
+
+    client = HttpClient(user_agent="registry.parasks api client")
+    shards = {}
+    missing = 0
+    for rid in (a.strip().upper() for a in sys.argv[1:]):
+        # One small shard file per lookup; shards are fetched once per run
+        key = shard_key(rid)
+        if key not in shards:
+            try:
+                shards[key] = client.get_json(BASE + SHARD_MANIFEST.replace("{SHARD}", key)).get("records", {})
+            except urllib.error.HTTPError as e:
+                if e.code != 404:  # no shard file = no IDs issued in that block
+                    print(f"FAIL: shard {key}: {type(e).__name__}: {e}")
+                shards[key] = {}
+            except Exception as e:
+                print(f"FAIL: shard {key}: {type(e).__name__}: {e}")
+                shards[key] = {}
+        meta = shards[key].get(rid)
+        if meta is None:
+            print(f"MISSING {rid}")
+            missing += 1
+            continue
+        print(f"{rid} {meta['contentHash']} {BASE}{meta['data']}")
+    return 0 if missing == 0 else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
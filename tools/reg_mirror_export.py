@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Mirror the registry from the NDJSON export, verifying while streaming.
+
+Usage:
+  python3 tools/reg_mirror_export.py                      # verify remote export
+  python3 tools/reg_mirror_export.py --out mirror/        # ... and write mirror/data/{ID}.jsonld
+  python3 tools/reg_mirror_export.py --file api/v1/export/registry.ndjson.gz
+
+Each line must seal to its contentHash and that hash must be the one in the
+published manifest (default: ../manifest.json next to the export; --manifest
+takes another URL or a local manifest.json / manifest.bin). Manifest IDs
+missing from the export and malformed lines are reported as FAIL.
+"""
+
+import argparse, json, os, sys, urllib.parse, urllib.request
+
+from registry_core import BASE, BinManifest, HttpClient, iter_export, load_json, verify_line, write_bytes
+from registry_core.export import compression_for
+
+EXPORT = "/api/v1/export/registry.ndjson.gz"
+
+def load_manifest(src: str) -> dict:
+    """{ID: contentHash} from a manifest.json URL or path, or a local manifest.bin."""
+    if src.endswith(".bin"):
+        with BinManifest(src) as bm:
+            if not bm.verify():
+                raise SystemExit(f"FAIL: {src} does not match its header checksum")
+            return dict(bm)
+    if "://" in src:
+        client = HttpClient(cache=None)
+        try:
+            doc = client.get_json(src)
+        finally:
+            client.close()
+    else:
+        doc = load_json(src)
+    return {rid: m["contentHash"] for rid, m in doc.get("records", {}).items()}
+
+def main():
+    ap = argparse.ArgumentParser(description="Stream and verify the registry NDJSON export.")
+    ap.add_argument("--file", help="read a local export instead of fetching BASE" + EXPORT)
+    ap.add_argument("--url", default=BASE + EXPORT)
+    ap.add_argument("--out", help="mirror directory; records are written to OUT/data/{ID}.jsonld")
+    ap.add_argument("--manifest", help="manifest to check hashes against (URL, manifest.json or manifest.bin)")
+    args = ap.parse_args()
+
+    src = args.file or args.url
+    if args.manifest:
+        manifest_src = args.manifest
+    elif args.file:
+        manifest_src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(args.file))), "manifest.json")
+    else:
+        manifest_src = urllib.parse.urljoin(args.url, "../manifest.json")
+    expected = load_manifest(manifest_src)
+
+    if args.file:
+        stream = open(args.file, "rb")
+    else:
+        # Plain urllib on purpose: the body is consumed as a stream, never held in memory
+        req = urllib.request.Request(args.url, headers={"User-Agent": "registry.parasks mirror"})
+        stream = urllib.request.urlopen(req, timeout=60)
+
+    ok = fail = 0
+    seen = set()
+    with stream:
+        for item in iter_export(stream, compression_for(src)):
+            if not isinstance(item, dict):
+                print(f"FAIL malformed line: {str(item)[:80]}")
+                fail += 1
+                continue
+            rid = item.get("id")
+            if isinstance(rid, str):
+                seen.add(rid)
+            if not verify_line(item, expected):
+                print(f"FAIL {rid} {item.get('contentHash')}")
+                fail += 1
+                continue
+            if args.out:
+                body = json.dumps(item["record"], indent=2, ensure_ascii=False) + "\n"
+                write_bytes(os.path.join(args.out, "data", f"{rid}.jsonld"), body.encode("utf-8"))
+            ok += 1
+    for rid in sorted(set(expected) - seen):
+        print(f"FAIL {rid} missing from the export")
+        fail += 1
+
+    print(f"\nSUMMARY: ok={ok} fail={fail}")
+    return 0 if fail == 0 else 2
+
+if __name__ == "__main__":
+    sys.exit(main())
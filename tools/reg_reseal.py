@@ -1,33 +1,62 @@
 #!/usr/bin/env python3
-import hashlib, json, sys
-from pathlib import Path
+"""
+Write the sealed contentHash into data/{ID}.jsonld.
 
-PLACEHOLDER = "sha256:REPLACED_AT_RUNTIME"
+Usage:
+  python3 tools/reg_reseal.py [--jobs N] <ID> [<ID> ...]
+  python3 tools/reg_reseal.py [--jobs N] --all
+  python3 tools/reg_reseal.py [--jobs N] --glob 'E0000*'
+  ... | python3 tools/reg_reseal.py [--jobs N] -        (IDs on stdin)
 
-def canon_bytes(obj: dict) -> bytes:
-    o = dict(obj)
-    o["contentHash"] = PLACEHOLDER
-    s = json.dumps(o, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
-    return s.encode("utf-8")
+Each file is read and sealed once in a worker; files whose stored hash
+already matches are skipped, the rest are written in one output
+transaction. Ends with a throughput line.
+"""
 
-def sha256_hex(b: bytes) -> str:
-    return hashlib.sha256(b).hexdigest()
+import fnmatch, os, sys, time
 
-def main(rid: str):
-    p = Path("data") / f"{rid}.jsonld"
-    if not p.exists():
-        print(f"FAIL: missing {p}")
+from registry_core import list_ids, output_txn, pop_jobs, reseal_ids, write_bytes
+
+USAGE = "USAGE: python3 tools/reg_reseal.py [--jobs N] (<ID> [<ID> ...] | --all | --glob PATTERN | -)"
+
+def select(argv: list[str]) -> list[str] | None:
+    if argv == ["--all"]:
+        return list_ids()
+    if len(argv) == 2 and argv[0] == "--glob":
+        return fnmatch.filter(list_ids(), argv[1].upper())
+    if argv == ["-"]:
+        return [line.strip().upper() for line in sys.stdin if line.strip()]
+    if argv and not any(a.startswith("-") for a in argv):
+        return [a.upper() for a in argv]
+    return None
+
+def main(rids: list[str], jobs: int = 1) -> int:
+    missing = [rid for rid in rids if not os.path.isfile(f"data/{rid}.jsonld")]
+    for rid in missing:
+        print(f"FAIL: missing data/{rid}.jsonld")
+    if missing:
         return 2
 
-    obj = json.loads(p.read_text(encoding="utf-8"))
-    h = sha256_hex(canon_bytes(obj))
-    obj["contentHash"] = f"sha256:{h}"
-    p.write_text(json.dumps(obj, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
-    print(f"OK: resealed {rid} -> sha256:{h}")
+    t0 = time.perf_counter()
+    resealed = 0
+    with output_txn():
+        for rid, ch, new in reseal_ids(rids, jobs=jobs):
+            if new is None:
+                continue
+            write_bytes(f"data/{rid}.jsonld", new)
+            resealed += 1
+            print(f"OK: resealed {rid} -> {ch}")
+    dt = time.perf_counter() - t0
+    rate = len(rids) / dt if dt > 0 else 0.0
+    print(f"OK: resealed {resealed} of {len(rids)} (unchanged={len(rids) - resealed}) "
+          f"in {dt:.3f}s ({rate:,.0f} records/s)")
     return 0
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("USAGE: python3 tools/reg_reseal.py <ID>")
+    argv = sys.argv[1:]
+    jobs = pop_jobs(argv)
+    rids = select(argv)
+    if not rids:
+        print(USAGE)
         raise SystemExit(2)
-    raise SystemExit(main(sys.argv[1]))
+    raise SystemExit(main(sorted(set(rids)), jobs))
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Search the registry through the static index under /api/v1/search/.
+
+Usage:
+  python3 tools/reg_search.py tag physics [relativity ...]
+  python3 tools/reg_search.py label eins [alb ...]
+
+tag matches whole tags, label matches label-word prefixes (at least
+KEY_CHARS characters; "albert eins" is two prefixes). Several terms are
+ANDed. Each term costs one small
+fetch of its shard; nothing else is downloaded.
+"""
+
+import sys, urllib.error
+
+from registry_core import BASE, HttpClient, term_key
+from registry_core.search import KEY_CHARS, match, query_terms
+
+CLIENT = HttpClient(user_agent="registry.parasks search client")
+
+def lookup(kind: str, q: str, client: HttpClient = CLIENT) -> set[str]:
+    try:
+        shard = client.request(f"{BASE}/api/v1/search/{kind}/{term_key(q)}.json").json()
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            return set()  # no term starts with this key
+        raise
+    return match(kind, shard, q)
+
+def search(kind: str, queries: list[str], client: HttpClient = CLIENT) -> list[str]:
+    hits = None
+    for q in [t for query in queries for t in query_terms(kind, query)]:
+        ids = lookup(kind, q, client)
+        hits = ids if hits is None else hits & ids
+        if not hits:
+            break
+    return sorted(hits or ())
+
+def main():
+    argv = sys.argv[1:]
+    kind = {"tag": "tags", "label": "labels"}.get(argv[0]) if argv else None
+    if kind is None or len(argv) < 2:
+        print("USAGE: python3 tools/reg_search.py (tag|label) <term> [<term> ...]", file=sys.stderr)
+        return 2
+    short = [t for q in argv[1:] for t in query_terms(kind, q) if kind == "labels" and len(t) < KEY_CHARS]
+    if short:
+        print(f"FAIL: label prefixes need at least {KEY_CHARS} characters: {' '.join(short)}", file=sys.stderr)
+        return 2
+
+    ids = search(kind, argv[1:])
+    for rid in ids:
+        print(rid)
+    print(f"OK: {len(ids)} match(es)", file=sys.stderr)
+    return 0 if ids else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Self-hosted resolver implementing api/v1/http.json.
+
+Usage:
+  python3 tools/reg_serve.py [--host 127.0.0.1] [--port 8080] [--reload-interval 2] [--log]
+
+At startup api/v1/index.json and api/v1/manifest.json are loaded into an
+in-memory index, together with every record and bundle (raw and gzipped).
+Routes:
+
+  /id/{ID}/                303 See Other -> /data/{ID}.jsonld when the client
+                           prefers JSON-LD/JSON, -> /page/{ID}/ for HTML or */*;
+                           406 if Accept allows neither; 404 for unknown IDs
+  /data/{ID}.jsonld        record bytes, ETag = sealed contentHash
+  /api/v1/bundle/{ID}.json bundle bytes, ETag = sha256 of the bundle
+  /api/v1/resolve/{ID}.json likewise
+  /page/{ID}/              page/{ID}/index.html from disk
+
+ETags are strong (the gzip representation carries its own "...-gz" tag),
+If-None-Match answers 304 for either tag, and gzip is used when
+Accept-Encoding allows it (q > 0). The manifest is polled every --reload-interval seconds;
+on change a new index is built beside the live one (unchanged records are
+reused) and swapped in atomically.
+"""
+
+import argparse, gzip, os, re, socket, sys, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from registry_core import hash_hex, load_json, sha256_hex
+
+INDEX = "api/v1/index.json"
+MANIFEST = "api/v1/manifest.json"
+GZIP_MIN = 512  # smaller bodies are not worth compressing
+
+ID_PATH = re.compile(r"^/id/([A-Z]\d{6})/?$")
+DATA_PATH = re.compile(r"^/data/([A-Z]\d{6})\.jsonld$")
+BUNDLE_PATH = re.compile(r"^/api/v1/bundle/([A-Z]\d{6})\.json$")
+RESOLVE_PATH = re.compile(r"^/api/v1/resolve/([A-Z]\d{6})\.json$")
+PAGE_PATH = re.compile(r"^/page/([A-Z]\d{6})/(?:index\.html)?$")
+
+JSONLD_TYPES = ("application/ld+json", "application/json")
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+
+class Body:
+    __slots__ = ("raw", "gz", "etag", "gz_etag", "ctype")
+
+    def __init__(self, raw: bytes, etag: str, ctype: str):
+        self.raw = raw
+        self.gz = gzip.compress(raw, mtime=0) if len(raw) >= GZIP_MIN else None
+        # Strong ETags identify one representation: the gzip bytes get their own
+        self.etag = f'"{etag}"'
+        self.gz_etag = f'"{etag}-gz"'
+        self.ctype = ctype
+
+def _stat(path: str):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def _read(path: str) -> bytes | None:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+class Registry:
+    """Immutable snapshot of the index; replaced wholesale on reload."""
+
+    def __init__(self, prev: "Registry | None" = None):
+        self.manifest_stat = _stat(MANIFEST)
+        manifest = load_json(MANIFEST).get("records", {})
+        ids = load_json(INDEX).get("records", {}) if os.path.isfile(INDEX) else manifest
+        old = prev.entries if prev else {}
+        self.entries: dict[str, tuple] = {}
+        for rid in ids:
+            meta = manifest.get(rid)
+            if not meta:
+                continue
+            ch = meta["contentHash"]
+            data_p, bundle_p, resolve_p = f"data/{rid}.jsonld", f"api/v1/bundle/{rid}.json", f"api/v1/resolve/{rid}.json"
+            key = (ch, _stat(data_p), _stat(bundle_p), _stat(resolve_p))
+            if rid in old and old[rid][0] == key:
+                self.entries[rid] = old[rid]  # unchanged since the last load
+                continue
+            raw = _read(data_p)
+            if raw is None:
+                continue
+            record = Body(raw, hash_hex(ch), "application/ld+json")
+            bundle, resolve = (Body(b, sha256_hex(b), "application/json") if b is not None else None
+                               for b in (_read(bundle_p), _read(resolve_p)))
+            self.entries[rid] = (key, record, bundle, resolve)
+
+def accepts(header: str, types: tuple[str, ...]) -> float:
+    """Highest q an Accept or Accept-Encoding header gives any of types (wildcards count)."""
+    if not header:
+        return 1.0
+    best = 0.0
+    for part in header.split(","):
+        mt, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for p in params:
+            if p.startswith("q="):
+                try:
+                    q = float(p[2:])
+                except ValueError:
+                    q = 0.0
+        mt = mt.lower()
+        for t in types:
+            if mt == t or mt in ("*/*", "*") or (mt.endswith("/*") and t.startswith(mt[:-1])):
+                best = max(best, q)
+    return best
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "registry.parasks-resolver"
+    # Buffer headers + body into one write (flushed after each request) and
+    # disable Nagle, so keep-alive clients do not wait on delayed ACKs
+    wbufsize = 1 << 16
+    log_requests = False
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, fmt, *args):
+        if self.log_requests:
+            super().log_message(fmt, *args)
+
+    def _send(self, status: int, body: bytes = b"", headers: dict | None = None, ctype: str = "text/plain; charset=utf-8"):
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        if body or status not in (204, 304):
+            self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _body(self, b: Body | None, vary: str = "Accept-Encoding"):
+        if b is None:
+            return self._send(404, b"Not Found\n")
+        # No Accept-Encoding means identity; gzip;q=0 refuses gzip
+        ae = self.headers.get("Accept-Encoding", "")
+        gz = b.gz is not None and bool(ae) and accepts(ae, ("gzip",)) > 0
+        hdrs = {"ETag": b.gz_etag if gz else b.etag, "Cache-Control": "no-cache", "Vary": vary}
+        inm = self.headers.get("If-None-Match", "")
+        tags = [t.strip() for t in inm.split(",")]
+        if inm == "*" or b.etag in tags or b.gz_etag in tags:
+            return self._send(304, headers=hdrs)
+        if gz:
+            hdrs["Content-Encoding"] = "gzip"
+            return self._send(200, b.gz, hdrs, b.ctype)
+        return self._send(200, b.raw, hdrs, b.ctype)
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        entries = self.server.registry.entries  # one snapshot per request
+        accept = self.headers.get("Accept", "")
+
+        m = ID_PATH.match(path)
+        if m:
+            if m.group(1) not in entries:
+                return self._send(404, b"Not Found\n")
+            rid = m.group(1)
+            q_data, q_html = accepts(accept, JSONLD_TYPES), accepts(accept, HTML_TYPES)
+            if q_data == 0 and q_html == 0:
+                return self._send(406, b"Not Acceptable: v1 serves JSON-LD and HTML\n", {"Vary": "Accept"})
+            target = f"/data/{rid}.jsonld" if q_data > q_html else f"/page/{rid}/"
+            return self._send(303, b"", {"Location": target, "Vary": "Accept"})
+
+        m = DATA_PATH.match(path)
+        if m:
+            e = entries.get(m.group(1))
+            # The response depends on Accept (406 or the record) as well as on Accept-Encoding
+            if e is not None and accept and accepts(accept, JSONLD_TYPES) == 0:
+                return self._send(406, b"Not Acceptable: records are application/ld+json\n",
+                                  {"Vary": "Accept, Accept-Encoding"})
+            return self._body(e[1] if e else None, "Accept, Accept-Encoding")
+
+        m = BUNDLE_PATH.match(path)
+        if m:
+            e = entries.get(m.group(1))
+            return self._body(e[2] if e else None)
+
+        m = RESOLVE_PATH.match(path)
+        if m:
+            e = entries.get(m.group(1))
+            return self._body(e[3] if e else None)
+
+        m = PAGE_PATH.match(path)
+        if m and m.group(1) in entries:
+            b = _read(f"page/{m.group(1)}/index.html")
+            if b is not None:
+                return self._send(200, b, {"Cache-Control": "no-cache"}, "text/html; charset=utf-8")
+
+        return self._send(404, b"Not Found\n")
+
+    do_HEAD = do_GET
+
+def watch(server, interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            if _stat(MANIFEST) == server.registry.manifest_stat:
+                continue
+            t0 = time.perf_counter()
+            server.registry = Registry(server.registry)  # atomic reference swap
+            print(f"OK: reloaded {len(server.registry.entries)} records in {time.perf_counter() - t0:.3f}s",
+                  file=sys.stderr)
+        except (OSError, ValueError, KeyError) as e:
+            # Mid-release manifest: keep serving the old snapshot and try again
+            print(f"WARN: reload failed, keeping previous index: {e}", file=sys.stderr)
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve /id/, /data/ and api/v1 bundles from an in-memory index.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--reload-interval", type=float, default=2.0, help="seconds between manifest checks (0 = off)")
+    ap.add_argument("--log", action="store_true", help="log every request to stderr")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    server.daemon_threads = True
+    server.registry = Registry()
+    Handler.log_requests = args.log
+    print(f"OK: loaded {len(server.registry.entries)} records in {time.perf_counter() - t0:.3f}s; "
+          f"serving http://{args.host}:{server.server_address[1]}/", file=sys.stderr)
+
+    if args.reload_interval > 0:
+        threading.Thread(target=watch, args=(server, args.reload_interval), daemon=True).start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
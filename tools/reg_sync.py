@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Keep a local mirror in sync using the per-audit-seq deltas.
+
+Usage:
+  python3 tools/reg_sync.py --out mirror/            # apply deltas since the last sync
+  python3 tools/reg_sync.py --out mirror/ --full     # force a full re-fetch
+
+The mirror holds OUT/data/{ID}.jsonld plus OUT/.sync.json, the audit seq and
+manifestSha256 it was last synced to. A sync fetches /api/v1/deltas/index.json
+and the deltas after that seq, checks that they chain (each prevSeq and
+prevManifestSha256 is the previous delta's), nets them out and fetches only
+the records added or changed since - each verified against its new sealed
+hash - and deletes removed ones. Only a broken chain (no state yet, a missing
+delta, or a record that no longer matches its delta) falls back to streaming
+the full NDJSON export - as does a registry that has not published
+deltas/index.json yet (404 or unreadable). A full fetch checks the export
+against /api/v1/manifest.json, and that manifest against the delta index's
+manifestSha256, before the state file records the seq; without a delta
+index no state is saved and the next run fetches in full again.
+"""
+
+import argparse, json, os, sys, urllib.error, urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from registry_core import (BASE, HttpClient, fold, iter_export, load_json, seal_obj, sha256_hex, verify_line, write_bytes,
+                           write_json)
+from registry_core.delta import INDEX, chain, delta_path
+from registry_core.export import compression_for
+
+EXPORT = "/api/v1/export/registry.ndjson.gz"
+MANIFEST = "/api/v1/manifest.json"
+STATE = ".sync.json"
+
+CLIENT = HttpClient(user_agent="registry.parasks sync client")
+
+def record_path(out: str, rid: str) -> str:
+    return os.path.join(out, "data", f"{rid}.jsonld")
+
+def fetch_record(item: tuple[str, str]):
+    rid, expected = item
+    try:
+        body = CLIENT.get_bytes(f"{BASE}/data/{rid}.jsonld")
+        return rid, body if seal_obj(json.loads(body.decode("utf-8"))) == expected else None
+    except (urllib.error.URLError, ValueError) as e:
+        print(f"FAIL {rid}: {type(e).__name__}: {e}")
+        return rid, None
+
+def apply_deltas(out: str, deltas: list[dict], concurrency: int) -> bool:
+    net = fold(deltas)
+    want = sorted((rid, ch) for rid, ch in net.items() if ch is not None)
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as ex:
+        fetched = list(ex.map(fetch_record, want))
+    stale = [rid for rid, body in fetched if body is None]
+    if stale:
+        print(f"WARN: {len(stale)} record(s) do not match their delta (first {stale[0]})")
+        return False
+    for rid, body in fetched:
+        write_bytes(record_path(out, rid), body)
+    removed = [rid for rid, ch in net.items() if ch is None]
+    for rid in removed:
+        try:
+            os.remove(record_path(out, rid))
+        except FileNotFoundError:
+            pass
+    print(f"OK: applied {len(deltas)} delta(s): {len(want)} fetched, {len(removed)} removed")
+    return True
+
+def fetch_index() -> dict | None:
+    """The delta index, or None if it is not published (404) or unreadable."""
+    try:
+        index = CLIENT.get_json(f"{BASE}/{INDEX}")
+    except urllib.error.HTTPError as e:
+        if e.code != 404:
+            raise
+        return None
+    except ValueError:
+        return None
+    if not isinstance(index, dict) or "latestSeq" not in index or "manifestSha256" not in index:
+        return None
+    return index
+
+def full_fetch(out: str, manifest_sha: str | None = None) -> tuple[int, int]:
+    # The export must match the published manifest, and that manifest the delta index being synced to
+    body = CLIENT.get_bytes(BASE + MANIFEST)
+    if manifest_sha is not None and f"sha256:{sha256_hex(body)}" != manifest_sha:
+        print(f"FAIL: {MANIFEST} does not match the delta index ({manifest_sha}); retry after the release settles")
+        return 0, 1
+    expected = {rid: m["contentHash"] for rid, m in json.loads(body.decode("utf-8")).get("records", {}).items()}
+
+    req = urllib.request.Request(BASE + EXPORT, headers={"User-Agent": "registry.parasks sync client"})
+    ok = fail = 0
+    seen = set()
+    with urllib.request.urlopen(req, timeout=60) as stream:
+        for item in iter_export(stream, compression_for(EXPORT)):
+            if not verify_line(item, expected):
+                print(f"FAIL {item.get('id') if isinstance(item, dict) else 'malformed line'}")
+                fail += 1
+                continue
+            rid = item["id"]
+            body = json.dumps(item["record"], indent=2, ensure_ascii=False) + "\n"
+            write_bytes(record_path(out, rid), body.encode("utf-8"))
+            seen.add(rid)
+            ok += 1
+    for rid in sorted(set(expected) - seen):
+        print(f"FAIL {rid} missing from the export")
+        fail += 1
+    data = os.path.join(out, "data")
+    if not fail and os.path.isdir(data):
+        for name in os.listdir(data):
+            if name.endswith(".jsonld") and name[:-len(".jsonld")] not in seen:
+                os.remove(os.path.join(data, name))
+    print(f"OK: full fetch: ok={ok} fail={fail}")
+    return ok, fail
+
+def main():
+    ap = argparse.ArgumentParser(description="Sync a local mirror by applying audit-seq deltas.")
+    ap.add_argument("--out", required=True, help="mirror directory; records live in OUT/data/{ID}.jsonld")
+    ap.add_argument("--full", action="store_true", help="ignore the saved state and re-fetch everything")
+    ap.add_argument("-c", "--concurrency", type=int, default=8, help="parallel record fetches (default 8)")
+    args = ap.parse_args()
+
+    state_path = os.path.join(args.out, STATE)
+    state = load_json(state_path) if os.path.isfile(state_path) and not args.full else {}
+    index = fetch_index()
+    if index is None:
+        print(f"WARN: /{INDEX} is not published; doing a full fetch")
+        _, fail = full_fetch(args.out)
+        return 2 if fail else 0
+    target = {"seq": index["latestSeq"], "manifestSha256": index["manifestSha256"]}
+
+    if state.get("seq") == target["seq"] and state.get("manifestSha256") == target["manifestSha256"]:
+        print(f"OK: up to date at seq {target['seq']}")
+        return 0
+
+    deltas = None
+    if "seq" in state:
+        try:
+            deltas = chain(index, state["seq"], state.get("manifestSha256"),
+                           lambda s: CLIENT.get_json(f"{BASE}/{delta_path(s)}"))
+        except urllib.error.HTTPError as e:
+            if e.code != 404:
+                raise
+        if deltas is None:
+            print(f"WARN: delta chain from seq {state['seq']} to {target['seq']} is broken; doing a full fetch")
+
+    if deltas is None or not apply_deltas(args.out, deltas, args.concurrency):
+        _, fail = full_fetch(args.out, target["manifestSha256"])
+        if fail:
+            return 2
+
+    write_json(state_path, target)
+    print(f"OK: synced {args.out} to seq {target['seq']} (was {state.get('seq', 'none')})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,45 +1,35 @@
 #!/usr/bin/env python3
-import hashlib, json, sys, urllib.request
+import sys
 
-BASE = "https://napier369.github.io/registry.parasks"
-
-def get_text(url: str) -> str:
-    req = urllib.request.Request(url, headers={"User-Agent": "registry.parasks verifier"})
-    with urllib.request.urlopen(req, timeout=30) as r:
-        return r.read().decode("utf-8")
-
-def canonical_json_bytes(obj: dict) -> bytes:
-    # Canonical JSON: sorted keys, stable separators, UTF-8
-    s = json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
-    return s.encode("utf-8")
-
-def sha256_hex(b: bytes) -> str:
-    return hashlib.sha256(b).hexdigest()
+from registry_core import PLACEHOLDER, HttpClient, hash_hex, http_get_json, profile, seal_obj
 
 def main():
+    profile.setup(sys.argv)
     if len(sys.argv) != 2:
         print("USAGE: python3 tools/reg_verify_id.py E000004", file=sys.stderr)
         return 2
 
+    client = HttpClient(user_agent="registry.parasks verifier")
     rid = sys.argv[1].strip().upper()
-    url = f"{BASE}/data/{rid}.jsonld"
-    obj = json.loads(get_text(url))
+    obj = http_get_json(f"/data/{rid}.jsonld", client)
 
     ch = obj.get("contentHash", "")
+    if ch == PLACEHOLDER:
+        # Published records carry the placeholder; the sealed hash lives in the bundle
+        ch = http_get_json(f"/api/v1/bundle/{rid}.json", client).get("contentHash", "")
     if not ch.startswith("sha256:"):
         raise SystemExit(f"FAIL: contentHash missing/invalid in {rid}")
 
-    expected = ch.split("sha256:", 1)[1].strip()
+    expected = hash_hex(ch)
 
     # Hash canonical form with contentHash neutralized (so record can contain its own hash)
-    obj2 = dict(obj)
-    obj2["contentHash"] = "sha256:"
-    actual = sha256_hex(canonical_json_bytes(obj2))
+    actual = hash_hex(seal_obj(obj))
 
     print("ID:", rid)
     print("expected:", expected)
     print("actual:  ", actual)
     print("OK" if expected == actual else "FAIL")
+    return 0 if expected == actual else 1
 
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -1,53 +1,124 @@
 #!/usr/bin/env python3
-import json, hashlib, urllib.request, urllib.error, time, random
+import argparse, os, sys, urllib.error, time, random
+from concurrent.futures import ThreadPoolExecutor
 
-BASE = "https://napier369.github.io/registry.parasks"
+from registry_core import (BASE, HttpClient, RateLimiter, hash_hex, load_json, profile, retry_after,
+                           root_hash, seal_obj, shard_hash, shard_key, write_json)
+
+CLIENT = HttpClient(user_agent="registry.parasks verifier")
+LIMITER = RateLimiter()
+
+# Ask intermediaries to revalidate instead of busting the URL with ?nocache=,
+# which would defeat connection and cache reuse.
+NO_CACHE = {"Cache-Control": "no-cache"}
 
 def http_get_json(path: str, retries: int = 6, base_sleep: float = 0.6):
     url = BASE + path
     last_err = None
     for attempt in range(retries):
+        LIMITER.wait()
         try:
-            # Always add a nocache param to reduce stale/cdn weirdness
-            sep = "&" if "?" in url else "?"
-            u = f"{url}{sep}nocache={int(time.time())}"
-            req = urllib.request.Request(u, headers={"User-Agent": "registry.parasks verifier"})
-            with urllib.request.urlopen(req, timeout=30) as r:
-                return json.loads(r.read().decode("utf-8"))
+            return CLIENT.request(url, NO_CACHE).json()
         except urllib.error.HTTPError as e:
             last_err = e
             # Retry on transient server errors + rate limits
             if e.code in (429, 500, 502, 503, 504):
                 sleep = base_sleep * (2 ** attempt) + random.random() * 0.25
-                time.sleep(sleep)
+                ra = retry_after(e.headers)
+                if ra is not None:
+                    # Server told us how long to back off: pause every worker, not just this one
+                    LIMITER.pause(ra)
+                    sleep = 0.0
+                profile.count(f"retry-http-{e.code}")
+                with profile.stage("retry-sleep"):
+                    time.sleep(sleep)
                 continue
             raise
         except Exception as e:
             last_err = e
             sleep = base_sleep * (2 ** attempt) + random.random() * 0.25
-            time.sleep(sleep)
+            profile.count("retry-error")
+            with profile.stage("retry-sleep"):
+                time.sleep(sleep)
             continue
     raise last_err
 
-def canonical_bytes_placeholder_sorted_min(obj: dict) -> bytes:
-    # v1 hash rule: placeholder contentHash allowed; sorted keys; minimal separators; UTF-8
-    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+def verify(item):
+    rid, meta = item
+    expected = hash_hex(meta["contentHash"])
+    try:
+        data = http_get_json(meta["data"])
+        return rid, expected, hash_hex(seal_obj(data)), None
+    except Exception as e:
+        return rid, expected, None, e
 
-def sha256_hex(b: bytes) -> str:
-    return hashlib.sha256(b).hexdigest()
+def changed_since(state: dict):
+    """
+    Walk the Merkle index from the last verified state.
+
+    Returns (records to verify, new state) where only shards whose hash
+    moved are fetched and only records whose sealed hash moved are listed.
+    """
+    tree = http_get_json("/api/v1/merkle/root.json")
+    shard_hashes = {k: v["hash"] for k, v in tree["shards"].items()}
+    if root_hash(shard_hashes) != tree["root"]:
+        raise SystemExit("FAIL: merkle root does not match its shard hashes")
+
+    new_state = {"root": tree["root"], "shards": shard_hashes, "records": {}}
+    if state.get("root") == tree["root"]:
+        new_state["records"] = state.get("records", {})
+        return {}, new_state
+
+    old_recs = state.get("records", {})
+    old_shards = state.get("shards", {})
+    old_by_shard = {}
+    for rid, ch in old_recs.items():
+        old_by_shard.setdefault(shard_key(rid), {})[rid] = ch
+    todo = {}
+    for key, meta in sorted(tree["shards"].items()):
+        if old_shards.get(key) == meta["hash"]:
+            new_state["records"].update(old_by_shard.get(key, {}))
+            continue
+        shard = http_get_json(meta["path"])
+        recs = shard.get("records", {})
+        if shard_hash(recs) != meta["hash"]:
+            raise SystemExit(f"FAIL: merkle shard {key} does not match root")
+        for rid, ch in recs.items():
+            if old_recs.get(rid) != ch:
+                todo[rid] = {"data": f"/data/{rid}.jsonld", "contentHash": ch}
+        new_state["records"].update(recs)
+    return todo, new_state
 
 def main():
-    mani = http_get_json("/api/v1/manifest.json")
-    recs = mani.get("records", {})
+    profile.setup(sys.argv)
+    ap = argparse.ArgumentParser(description="Verify every record in the remote manifest.")
+    ap.add_argument("-c", "--concurrency", type=int, default=8, help="parallel fetches (default 8)")
+    ap.add_argument("--rate", type=float, default=0.0, help="max requests/second across all workers (0 = unlimited)")
+    ap.add_argument("--state", help="incremental mode: verify only what changed since the root saved in this file")
+    args = ap.parse_args()
+
+    global LIMITER
+    LIMITER = RateLimiter(args.rate)
+
+    new_state = None
+    if args.state:
+        state = load_json(args.state) if os.path.isfile(args.state) else {}
+        recs, new_state = changed_since(state)
+        print(f"merkle root {new_state['root']} (previous {state.get('root') or 'none'}), {len(recs)} changed")
+    else:
+        mani = http_get_json("/api/v1/manifest.json")
+        recs = mani.get("records", {})
     ok = fail = 0
 
-    for rid, meta in sorted(recs.items()):
-        expected = meta["contentHash"].split("sha256:", 1)[-1].strip()
-        data_path = meta["data"]
-        try:
-            data = http_get_json(data_path)
-            actual = sha256_hex(canonical_bytes_placeholder_sorted_min(data))
-            if actual == expected:
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as ex:
+        # map() yields in submission order, so output stays sorted by ID
+        for rid, expected, actual, err in ex.map(verify, sorted(recs.items())):
+            if err is not None:
+                print(f"FAIL {rid}")
+                print(f"  expected: {expected}")
+                print(f"  error:    {type(err).__name__}: {err}")
+                fail += 1
+            elif actual == expected:
                 print(f"OK  {rid} {actual}")
                 ok += 1
             else:
@@ -55,13 +126,11 @@ def main():
                 print(f"  expected: {expected}")
                 print(f"  actual:   {actual}")
                 fail += 1
-        except Exception as e:
-            print(f"FAIL {rid}")
-            print(f"  expected: {expected}")
-            print(f"  error:    {type(e).__name__}: {e}")
-            fail += 1
 
     print(f"\nSUMMARY: ok={ok} fail={fail}")
+    if new_state is not None and fail == 0:
+        # Only advance the trusted root once everything under it verified
+        write_json(args.state, new_state)
     return 0 if fail == 0 else 2
 
 if __name__ == "__main__":
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the registry tools.
+
+Usage:
+  python3 tools/registry.py <command> [args...] [+ <command> [args...] ...]
+
+Commands run in this process, one after another, stopping at the first
+failure; "+" separates them, e.g.
+
+  python3 tools/registry.py build --incremental + render + check + audit snapshot
+
+Each command runs the existing tools/ script unchanged (same flags, same
+output), but modules are only imported when their command runs and
+registry_core is shared, so a pipeline pays for one interpreter start.
+"""
+
+import os, runpy, sys
+
+TOOLS = os.path.dirname(os.path.abspath(__file__))
+
+# command -> script; "audit" takes a sub-command
+COMMANDS = {
+    "build": "build_api_v1.py",
+    "render": "render_pages.py",
+    "reseal": "reg_reseal.py",
+    "check": "reg_check_all.py",
+    "issue-check": "issue_check.py",
+    "verify": "reg_verify_manifest.py",
+    "verify-id": "reg_verify_id.py",
+    "lookup": "reg_lookup.py",
+    "mirror": "reg_mirror_export.py",
+    "sync": "reg_sync.py",
+    "ids": "reg_ids.py",
+    "derive": "derive_wikipedia.py",
+    "serve": "reg_serve.py",
+    "search": "reg_search.py",
+    "binmanifest": "reg_binmanifest.py",
+    "resolve": "gen_api_v1_resolve.py",
+    "bundles": "gen_api_v1_bundles.py",
+    "latest-audit": "build_api_v1_latest_audit.py",
+}
+AUDIT = {
+    "snapshot": "audit_snapshot_manifest.py",
+    "query": "audit_query.py",
+    "verify": "verify_audit_chain.py",
+}
+
+def usage() -> int:
+    print(__doc__.strip(), file=sys.stderr)
+    print("\nCommands: " + " ".join(sorted(COMMANDS)) + " audit {" + ",".join(AUDIT) + "}", file=sys.stderr)
+    return 2
+
+def split_commands(argv: list[str]) -> list[list[str]]:
+    cmds, cur = [], []
+    for a in argv:
+        if a == "+":
+            cmds.append(cur)
+            cur = []
+        else:
+            cur.append(a)
+    cmds.append(cur)
+    return [c for c in cmds if c]
+
+def script_for(cmd: list[str]) -> tuple[str, list[str]] | None:
+    name, args = cmd[0], cmd[1:]
+    if name == "audit":
+        if not args or args[0] not in AUDIT:
+            return None
+        return AUDIT[args[0]], args[1:]
+    if name not in COMMANDS:
+        return None
+    return COMMANDS[name], args
+
+def run(script: str, args: list[str]) -> int:
+    # Same contract as `python3 tools/<script> args...`: argv, __main__, exit status
+    path = os.path.join(TOOLS, script)
+    saved = sys.argv
+    sys.argv = [path, *args]
+    try:
+        runpy.run_path(path, run_name="__main__")
+        return 0
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+    finally:
+        sys.argv = saved
+        sys.stdout.flush()
+
+def main(argv: list[str]) -> int:
+    cmds = split_commands(argv)
+    if not cmds or cmds[0][0] in ("-h", "--help", "help"):
+        return usage()
+    plan = [script_for(c) for c in cmds]
+    for cmd, p in zip(cmds, plan):
+        if p is None:
+            print(f"FAIL: unknown command: {' '.join(cmd[:2])}", file=sys.stderr)
+            return usage()
+    for script, args in plan:
+        rc = run(script, args)
+        if rc:
+            return rc
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,54 @@
+"""
+registry_core: shared code for the tools/ scripts.
+
+One canonicalizer and sealed-hash rule (canon), streaming hashing (hashing),
+JSON file I/O (jsonio), a keep-alive HTTP client (net) with an on-disk
+conditional-GET cache (httpcache), the parallel sealing stage (seal), the
+shard layout (shards), the Merkle index over the manifest (merkle), the
+mmap-able binary manifest (binmanifest), the static tag/label search index
+(search), per-audit-seq manifest deltas (delta), the streaming NDJSON
+export (export), the issued-ID index and allocator (ids), string helpers
+(text), crash-safe output staging (txn), fork-free git metadata (gitinfo)
+and opt-in stage timing (profile, imported as a module:
+`from registry_core import profile`).
+Tools run from the repo root as `python3 tools/x.py`, which puts tools/ on
+sys.path so `import registry_core` works.
+"""
+
+import importlib
+
+# name -> submodule; submodules (and their stdlib imports: http.client,
+# gzip, concurrent.futures, ...) are only loaded on first attribute access,
+# so a tool that needs load_json does not pay for the HTTP client.
+_EXPORTS = {
+    "binmanifest": ["BinManifest", "write_bin_manifest"],
+    "canon": ["PLACEHOLDER", "canonical_bytes", "hash_hex", "seal_obj", "sealed_bytes"],
+    "delta": ["delta_path", "diff", "fold"],
+    "export": ["iter_export", "iter_lines", "verify_line", "write_export"],
+    "gitinfo": ["git_head"],
+    "hashing": ["sha256_file", "sha256_hex", "sha256_iter"],
+    "httpcache": ["HttpCache"],
+    "ids": ["IdIndex", "list_ids", "locked_index", "unsynced"],
+    "jsonio": ["json_bytes", "load_json", "write_bytes", "write_json", "write_json_stream"],
+    "merkle": ["build_tree", "leaf_hash", "root_hash", "shard_hash"],
+    "net": ["BASE", "HttpClient", "RateLimiter", "default_client", "http_get_json", "retry_after"],
+    "seal": ["pop_jobs", "reseal_ids", "seal_ids", "seal_path", "seal_terms_ids"],
+    "search": ["add_terms", "build_index", "new_index", "record_terms", "sorted_index", "term_key"],
+    "shards": ["SHARD_SIZE", "group_by_shard", "shard_key"],
+    "text": ["slugify"],
+    "txn": ["output_txn", "remove_file"],
+}
+_OWNER = {name: mod for mod, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_OWNER)
+
+def __getattr__(name: str):
+    mod = _OWNER.get(name)
+    if mod is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{mod}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
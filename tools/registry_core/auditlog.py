@@ -0,0 +1,213 @@
+"""
+Segmented audit log index.
+
+audit/logs/index.json is a small head pointer:
+
+    {"latest": "/audit/logs/000011.json", "latestSeq": 11, "pageSize": 1000,
+     "pageTemplate": "/audit/logs/pages/{PAGE}.json",
+     "logs": ["/audit/logs/000001.json", ..., "/audit/logs/000011.json"]}
+
+"logs" keeps the original index's list of entry paths for existing readers,
+but only the last LOGS_TAIL of them (oldest first); the full history is in
+the pages.
+
+Entries are summarised in fixed-size pages (audit/logs/pages/000000.json
+holds seq 1..1000, 000001.json seq 1001..2000, ...). Appending rewrites the
+entry file, one page and the head, so its cost does not grow with the log;
+the next sequence number comes from latestSeq instead of parsing a path.
+Range queries load only the pages that overlap the range.
+
+Entries are hash-chained: each new entry carries prevEntrySha256, the
+SHA-256 of the previous entry file's bytes. Every CHECKPOINT_EVERY entries
+a CHECKPOINT entry is appended (head.lastCheckpoint points at it), giving
+verifiers a stable anchor to resume from; see tools/verify_audit_chain.py.
+Entries written before chaining started carry no prevEntrySha256 key; the
+head's chainStart names the first entry that does, and every entry from
+there on must be linked.
+
+Appends read the head and write entry, page and head inside one
+output_txn, whose exclusive staging lock serialises concurrent snapshots:
+two runs can never claim the same seq.
+"""
+
+from __future__ import annotations
+
+import glob, os, re
+
+from .hashing import sha256_file, sha256_hex
+from .jsonio import json_bytes, load_json, write_json
+from .txn import output_txn, read_path
+
+ROOT = "audit/logs"
+PAGE_SIZE = 1000
+CHECKPOINT_EVERY = 100
+LOGS_TAIL = 100
+
+def seq_name(seq: int) -> str:
+    # Zero-padded to six digits; wider numbers simply get longer names
+    return f"{seq:06d}"
+
+def entry_seq(entry: dict) -> int:
+    # Older entries store seq as an int, newer ones as a zero-padded string
+    return int(entry["seq"])
+
+def summary(seq: int, entry: dict, root: str = ROOT) -> dict:
+    s = {"seq": seq, "path": f"/{root}/{seq_name(seq)}.json", "time": entry.get("time") or entry.get("ts")}
+    if entry.get("event"):
+        s["event"] = entry["event"]
+    return s
+
+class AuditLog:
+    def __init__(self, root: str = ROOT, page_size: int = PAGE_SIZE, checkpoint_every: int = CHECKPOINT_EVERY):
+        self.root = root
+        self.page_size = page_size
+        self.checkpoint_every = checkpoint_every
+        self.index_path = os.path.join(root, "index.json")
+
+    # -- head + pages -------------------------------------------------------
+
+    # Reads go through read_path so that, inside an outer output_txn, they see
+    # what this transaction already staged (a migration, an earlier append)
+
+    def head(self) -> dict:
+        path = read_path(self.index_path)
+        if not os.path.isfile(path):
+            return {"latest": None, "latestSeq": 0}
+        head = load_json(path)
+        if "latestSeq" not in head:
+            # Pre-segmented index: derive the sequence once from the latest path
+            m = re.search(r"/(\d+)\.json$", head.get("latest") or "")
+            head["latestSeq"] = int(m.group(1)) if m else 0
+        return head
+
+    def page_no(self, seq: int) -> int:
+        return (seq - 1) // self.page_size
+
+    def page_path(self, page: int) -> str:
+        return os.path.join(self.root, "pages", f"{page:06d}.json")
+
+    def load_page(self, page: int) -> dict:
+        p = read_path(self.page_path(page))
+        if os.path.isfile(p):
+            return load_json(p)
+        return {"page": page, "first": page * self.page_size + 1, "entries": []}
+
+    def entry_path(self, seq: int) -> str:
+        return os.path.join(self.root, f"{seq_name(seq)}.json")
+
+    def _head_doc(self, seq: int, last_checkpoint: int | None = None, logs: list[str] | None = None,
+                  chain_start: int | None = None) -> dict:
+        head = {
+            "latest": f"/{self.root}/{seq_name(seq)}.json" if seq else None,
+            "latestSeq": seq,
+            "pageSize": self.page_size,
+            "pageTemplate": f"/{self.root}/pages/{{PAGE}}.json"
+        }
+        if chain_start:
+            head["chainStart"] = chain_start
+        if last_checkpoint:
+            head["lastCheckpoint"] = last_checkpoint
+        head["logs"] = (logs or [])[-LOGS_TAIL:]
+        return head
+
+    def _logs(self, head: dict) -> list[str]:
+        # Heads written before "logs" came back: take the tail from the pages
+        if "logs" in head:
+            return list(head["logs"])
+        seq = head["latestSeq"]
+        return [e["path"] for e in self.between(max(1, seq - LOGS_TAIL + 1), seq)] if seq else []
+
+    # -- writes -------------------------------------------------------------
+
+    def next_seq(self) -> int:
+        return self.head()["latestSeq"] + 1
+
+    def ensure_paged(self) -> None:
+        """Migrate a pre-segmented log (no pageSize in the head, or pages/ missing) once."""
+        with output_txn():
+            head = self.head()
+            if "pageSize" not in head or (head["latestSeq"] and not os.path.isfile(read_path(self.page_path(0)))):
+                self.rebuild_pages()
+
+    def append(self, entry: dict) -> tuple[int, str]:
+        """Write entry as the next sequence number (plus a checkpoint when due); returns (seq, path)."""
+        # Reading the head inside the transaction holds the staging lock until the entry is committed
+        with output_txn():
+            return self._append(entry)
+
+    def _append(self, entry: dict) -> tuple[int, str]:
+        self.ensure_paged()
+        head = self.head()
+        seq = head["latestSeq"] + 1
+        last_cp = head.get("lastCheckpoint", 0)
+
+        prev = read_path(self.entry_path(seq - 1))
+        prev_sha = f"sha256:{sha256_file(prev)}" if seq > 1 and os.path.isfile(prev) else None
+        new = [(seq, {"seq": seq_name(seq), **entry, "prevEntrySha256": prev_sha})]
+        if seq - last_cp >= self.checkpoint_every:
+            cp = seq + 1
+            new.append((cp, {
+                "seq": seq_name(cp),
+                "time": entry.get("time"),
+                "event": "CHECKPOINT",
+                "covers": {"from": last_cp + 1, "to": seq},
+                "prevEntrySha256": f"sha256:{sha256_hex(json_bytes(new[0][1]))}"
+            }))
+            last_cp = cp
+
+        for q, _ in new:
+            if os.path.exists(read_path(self.entry_path(q))):
+                raise SystemExit(f"FAIL: {self.entry_path(q)} already exists (audit log is append-only)")
+        pages = {}
+        for q, e in new:
+            page = pages.get(self.page_no(q)) or self.load_page(self.page_no(q))
+            page["entries"].append(summary(q, e, self.root))
+            pages[self.page_no(q)] = page
+        logs = self._logs(head) + [f"/{self.root}/{seq_name(q)}.json" for q, _ in new]
+        # Entries, pages and head land together or not at all
+        for q, e in new:
+            write_json(self.entry_path(q), e)
+        for n, page in pages.items():
+            write_json(self.page_path(n), page)
+        # The first linked entry fixes chainStart for good
+        write_json(self.index_path, self._head_doc(new[-1][0], last_cp, logs, head.get("chainStart") or seq))
+        return seq, self.entry_path(seq)
+
+    def rebuild_pages(self) -> int:
+        """One-off migration: page every existing entry file and rewrite the head."""
+        pages: dict[int, dict] = {}
+        last = last_cp = 0
+        chain_start = self.head().get("chainStart")
+        for p in sorted(glob.glob(os.path.join(self.root, "[0-9]*.json"))):
+            entry = load_json(p)
+            seq = entry_seq(entry)
+            page = pages.setdefault(self.page_no(seq), {
+                "page": self.page_no(seq), "first": self.page_no(seq) * self.page_size + 1, "entries": []
+            })
+            page["entries"].append(summary(seq, entry, self.root))
+            last = max(last, seq)
+            if entry.get("event") == "CHECKPOINT":
+                last_cp = max(last_cp, seq)
+            if "prevEntrySha256" in entry and (chain_start is None or seq < chain_start):
+                chain_start = seq
+        logs = [e["path"] for n in sorted(pages) for e in sorted(pages[n]["entries"], key=lambda e: e["seq"])]
+        with output_txn():
+            for n, page in pages.items():
+                page["entries"].sort(key=lambda e: e["seq"])
+                write_json(self.page_path(n), page)
+            write_json(self.index_path, self._head_doc(last, last_cp, logs, chain_start))
+        return last
+
+    # -- reads --------------------------------------------------------------
+
+    def between(self, a: int, b: int | None = None):
+        """Yield page summaries for a <= seq <= b (b defaults to latest), loading only overlapping pages."""
+        if b is None:
+            b = self.head()["latestSeq"]
+        for n in range(self.page_no(max(a, 1)), self.page_no(b) + 1):
+            for e in self.load_page(n)["entries"]:
+                if a <= e["seq"] <= b:
+                    yield e
+
+    def entry(self, seq: int) -> dict:
+        return load_json(self.entry_path(seq))
@@ -0,0 +1,107 @@
+"""
+Fixed-width binary manifest (api/v1/manifest.bin).
+
+Layout, little-endian:
+
+    header  52 bytes  magic b"RPMANIF1", u16 version, u8 id length (7),
+                      u8 digest length (32), u64 record count,
+                      32-byte SHA-256 of the record section
+    records count * 39 bytes, sorted by ID:
+                      7 ASCII ID bytes + 32 raw SHA-256 digest bytes
+
+The digest is the sealed contentHash of the record (same value as
+manifest.json). Readers mmap the file and binary-search it: opening checks
+only the header, verify() re-hashes the record section.
+"""
+
+from __future__ import annotations
+
+import hashlib, mmap, re, struct
+from typing import Iterable
+
+from .jsonio import write_bytes
+
+MAGIC = b"RPMANIF1"
+VERSION = 1
+ID_LEN = 7
+DIGEST_LEN = 32
+RECORD = ID_LEN + DIGEST_LEN
+_HEAD = struct.Struct("<8sHBBQ32s")
+HEADER_SIZE = _HEAD.size
+_RID_RE = re.compile(r"^[A-Z]\d{6}$")
+
+def encode(sealed: dict[str, str] | Iterable[tuple[str, str]]) -> bytes:
+    """{ID: "sha256:<hex>"}, or (ID, hash) pairs already sorted by ID -> file bytes."""
+    pairs = ((rid, sealed[rid]) for rid in sorted(sealed)) if isinstance(sealed, dict) else sealed
+    body = bytearray()
+    n, last = 0, ""
+    for rid, ch in pairs:
+        if not _RID_RE.match(rid):
+            raise ValueError(f"ID not representable in the binary manifest: {rid!r}")
+        if rid <= last:
+            raise ValueError(f"binary manifest IDs must be sorted and unique: {rid} after {last}")
+        body += rid.encode("ascii")
+        body += bytes.fromhex(ch.split("sha256:", 1)[-1])
+        n, last = n + 1, rid
+    return _HEAD.pack(MAGIC, VERSION, ID_LEN, DIGEST_LEN, n, hashlib.sha256(body).digest()) + bytes(body)
+
+def write_bin_manifest(path: str, sealed: dict[str, str] | Iterable[tuple[str, str]]) -> bool:
+    return write_bytes(path, encode(sealed))
+
+class BinManifest:
+    """Read-only, mmap-backed view; lookups are O(log N) and parse nothing."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < HEADER_SIZE:
+            raise ValueError(f"{path}: truncated header")
+        magic, version, id_len, digest_len, count, self.checksum = _HEAD.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION or id_len != ID_LEN or digest_len != DIGEST_LEN:
+            raise ValueError(f"{path}: not a v{VERSION} binary manifest")
+        if len(self._mm) != HEADER_SIZE + count * RECORD:
+            raise ValueError(f"{path}: size does not match record count {count}")
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _id_at(self, i: int) -> bytes:
+        off = HEADER_SIZE + i * RECORD
+        return self._mm[off:off + ID_LEN]
+
+    def _hash_at(self, i: int) -> str:
+        off = HEADER_SIZE + i * RECORD + ID_LEN
+        return "sha256:" + self._mm[off:off + DIGEST_LEN].hex()
+
+    def get(self, rid: str) -> str | None:
+        """Sealed contentHash for rid, or None."""
+        key = rid.encode("ascii", "replace")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._id_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self._id_at(lo) == key:
+            return self._hash_at(lo)
+        return None
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self._id_at(i).decode("ascii"), self._hash_at(i)
+
+    def verify(self) -> bool:
+        """Re-hash the record section against the header checksum."""
+        return hashlib.sha256(memoryview(self._mm)[HEADER_SIZE:]).digest() == self.checksum
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
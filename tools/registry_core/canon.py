@@ -0,0 +1,41 @@
+"""
+The single v1 canonicalizer.
+
+Sealed hash rule: set contentHash to PLACEHOLDER, dump with sorted keys and
+minimal separators, encode as UTF-8, SHA-256 the bytes. Older tools
+neutralized with "sha256:" instead; that rule is retired and never matches
+the manifest.
+"""
+
+from __future__ import annotations
+
+import json
+
+from .hashing import sha256_hex
+from .profile import stage
+
+PLACEHOLDER = "sha256:REPLACED_AT_RUNTIME"
+
+# One preconfigured encoder; json.dumps() builds a new one per call when
+# given non-default options, which shows up at registry scale.
+_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+def canonical_bytes(obj) -> bytes:
+    # sorted keys, min separators, utf-8
+    return _ENCODER.encode(obj).encode("utf-8")
+
+def sealed_bytes(obj: dict) -> bytes:
+    # Canonical bytes with contentHash neutralized; does not mutate obj
+    o = dict(obj)
+    o["contentHash"] = PLACEHOLDER
+    with stage("canonicalize"):
+        return canonical_bytes(o)
+
+def seal_obj(obj: dict) -> str:
+    b = sealed_bytes(obj)
+    with stage("hash"):
+        return f"sha256:{sha256_hex(b)}"
+
+def hash_hex(content_hash: str) -> str:
+    # "sha256:<hex>" -> "<hex>"
+    return content_hash.split("sha256:", 1)[-1].strip()
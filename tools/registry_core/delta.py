@@ -0,0 +1,82 @@
+"""
+Per-audit-sequence change sets of the manifest.
+
+Each manifest snapshot (tools/audit_snapshot_manifest.py) compares the
+manifest it pins with the one pinned by the previous snapshot and writes
+
+    /api/v1/deltas/{SEQ}.json
+      {"seq": 12, "prevSeq": 10, "prevManifestSha256": ..., "manifestSha256": ...,
+       "added": {ID: hash}, "changed": {ID: {"from": old, "to": new}}, "removed": {ID: old}}
+
+/api/v1/deltas/index.json lists the sequences that have a delta (CHECKPOINT
+entries never do) plus the latest snapshot's seq and manifestSha256. The
+hashes that snapshot pinned are kept as a binary manifest in
+/api/v1/deltas/head.bin, so the next diff needs neither git history nor the
+old manifest.json. The first snapshot only records that base; it is also
+the one that adds the delta endpoints to /api/v1/capabilities.json, so they
+are never advertised before they exist.
+"""
+
+from __future__ import annotations
+
+DELTA_DIR = "api/v1/deltas"
+INDEX = f"{DELTA_DIR}/index.json"
+HEAD_BIN = f"{DELTA_DIR}/head.bin"
+
+ENDPOINTS = {"deltaIndex": f"/{INDEX}", "deltaTemplate": f"/{DELTA_DIR}/{{SEQ}}.json"}
+NOTE = ("Deltas: each audit snapshot after the first writes deltaTemplate ({SEQ} = 6-digit audit seq) with the "
+        "IDs added/changed/removed since the previous snapshot (old and new sealed hashes) and "
+        "prevSeq/prevManifestSha256 to chain them; deltaIndex lists the seqs. Mirrors apply only the deltas "
+        "after their last seq; see tools/reg_sync.py.")
+
+def advertise(caps: dict) -> bool:
+    """Add the delta endpoints and note to a capabilities document; False if already there."""
+    endpoints = caps.setdefault("endpoints", {})
+    notes = caps.setdefault("notes", [])
+    if all(endpoints.get(k) == v for k, v in ENDPOINTS.items()) and NOTE in notes:
+        return False
+    endpoints.update(ENDPOINTS)
+    if NOTE not in notes:
+        notes.append(NOTE)
+    return True
+
+def delta_path(seq: int) -> str:
+    return f"{DELTA_DIR}/{seq:06d}.json"
+
+def diff(old: dict[str, str], new: dict[str, str]) -> tuple[dict, dict, dict]:
+    """{ID: contentHash} before/after -> (added, changed, removed), each sorted by ID."""
+    added = {rid: new[rid] for rid in sorted(new) if rid not in old}
+    changed = {rid: {"from": old[rid], "to": new[rid]} for rid in sorted(new)
+               if rid in old and old[rid] != new[rid]}
+    removed = {rid: old[rid] for rid in sorted(old) if rid not in new}
+    return added, changed, removed
+
+def fold(deltas: list[dict]) -> dict[str, str | None]:
+    """Net effect of consecutive deltas: {ID: final contentHash, or None if removed}."""
+    net: dict[str, str | None] = {}
+    for d in deltas:
+        net.update(d.get("added", {}))
+        net.update({rid: c["to"] for rid, c in d.get("changed", {}).items()})
+        net.update({rid: None for rid in d.get("removed", {})})
+    return net
+
+def chain(index: dict, since: int, since_sha: str, fetch) -> list[dict] | None:
+    """
+    Deltas after seq `since`, oldest first, fetched with fetch(seq).
+
+    Returns None when they do not link back unbroken to the snapshot
+    (`since`, `since_sha`) the caller last applied - a delta is missing, or
+    the local seq predates the first delta - so it has to fall back to a
+    full fetch.
+    """
+    prev, prev_sha = since, since_sha
+    out = []
+    for s in [s for s in index.get("seqs", []) if s > since]:
+        d = fetch(s)
+        if d.get("seq") != s or d.get("prevSeq") != prev or d.get("prevManifestSha256") != prev_sha:
+            return None
+        out.append(d)
+        prev, prev_sha = s, d.get("manifestSha256")
+    if prev != index.get("latestSeq") or prev_sha != index.get("manifestSha256"):
+        return None
+    return out
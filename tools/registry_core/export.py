@@ -0,0 +1,81 @@
+"""
+Streaming NDJSON export of the whole registry.
+
+One line per record, sorted by ID, minimal separators:
+
+    {"contentHash":"sha256:<hex>","id":"E000003","record":{...}}
+
+The record keeps the key order of data/{ID}.jsonld, so a mirror re-dumping
+it with indent=2 reproduces the published file byte for byte.
+
+Lines are produced by generators and written/read through (optionally
+compressed) streams, so memory stays flat regardless of registry size.
+gzip output is byte-for-byte reproducible (mtime=0, no filename).
+"""
+
+from __future__ import annotations
+
+import gzip, json, os
+from typing import BinaryIO, Iterable, Iterator
+
+from . import txn
+from .canon import seal_obj
+
+COMPRESSIONS = {"none": "", "gzip": ".gz"}
+
+def iter_lines(sealed: Iterable[tuple[str, str]], data_dir: str = "data") -> Iterator[bytes]:
+    # sealed: (ID, contentHash) pairs in ID order
+    for rid, ch in sealed:
+        with open(os.path.join(data_dir, f"{rid}.jsonld"), "r", encoding="utf-8") as f:
+            rec = json.load(f)
+        head = json.dumps({"contentHash": ch, "id": rid}, separators=(",", ":"), ensure_ascii=False)
+        body = json.dumps(rec, separators=(",", ":"), ensure_ascii=False)
+        yield f'{head[:-1]},"record":{body}}}\n'.encode("utf-8")
+
+def open_writer(raw: BinaryIO, compress: str) -> BinaryIO:
+    if compress == "gzip":
+        return gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0)
+    return raw
+
+def open_reader(raw: BinaryIO, compress: str) -> BinaryIO:
+    if compress == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode="rb")
+    return raw
+
+def compression_for(path: str) -> str:
+    for name, ext in COMPRESSIONS.items():
+        if ext and path.endswith(ext):
+            return name
+    return "none"
+
+def write_export(path: str, lines: Iterable[bytes], compress: str = "gzip") -> bool:
+    """Stream lines to path; returns True if the file changed. Unchanged output is left untouched."""
+    tmp = txn.tmp_for(path)
+    os.makedirs(os.path.dirname(tmp) or ".", exist_ok=True)
+    with open(tmp, "wb") as raw:
+        w = open_writer(raw, compress)
+        for line in lines:
+            w.write(line)
+        if w is not raw:
+            w.close()
+    return txn.finish(path, tmp)
+
+def iter_export(stream: BinaryIO, compress: str = "none") -> Iterator[dict]:
+    for line in open_reader(stream, compress):
+        if line.strip():
+            yield json.loads(line)
+
+def verify_line(item, expected=None) -> bool:
+    """
+    True if the line's record seals to its contentHash and, given `expected`
+    ({ID: contentHash} or a BinManifest), that hash is the published one.
+    A malformed line is False, never an exception.
+    """
+    if not isinstance(item, dict) or not isinstance(item.get("record"), dict):
+        return False
+    rid, ch = item.get("id"), item.get("contentHash")
+    if not isinstance(rid, str) or not isinstance(ch, str):
+        return False
+    if expected is not None and expected.get(rid) != ch:
+        return False
+    return seal_obj(item["record"]) == ch
@@ -0,0 +1,56 @@
+"""
+Git metadata without forking `git`.
+
+HEAD is resolved by reading .git directly: a detached HEAD holds the commit
+id, otherwise "ref: refs/heads/<branch>" is looked up as a loose ref and
+then in packed-refs. Worktrees and submodules (.git is a file holding
+"gitdir: <path>") are followed, including the commondir indirection.
+"""
+
+from __future__ import annotations
+
+import os
+
+def git_dir(repo: str = ".") -> str | None:
+    d = os.path.join(repo, ".git")
+    if os.path.isfile(d):
+        with open(d, "r", encoding="utf-8") as f:
+            line = f.read().strip()
+        if not line.startswith("gitdir:"):
+            return None
+        d = os.path.normpath(os.path.join(repo, line[len("gitdir:"):].strip()))
+    return d if os.path.isdir(d) else None
+
+def _read(path: str) -> str | None:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def resolve_ref(gdir: str, ref: str) -> str | None:
+    # Branch refs live in the common dir for linked worktrees
+    common = _read(os.path.join(gdir, "commondir"))
+    dirs = [gdir] + ([os.path.normpath(os.path.join(gdir, common))] if common else [])
+    for d in dirs:
+        sha = _read(os.path.join(d, ref))
+        if sha:
+            return sha
+    for d in dirs:
+        packed = _read(os.path.join(d, "packed-refs")) or ""
+        for line in packed.splitlines():
+            if line and line[0] not in "#^":
+                sha, _, name = line.partition(" ")
+                if name == ref:
+                    return sha
+    return None
+
+def git_head(repo: str = ".") -> str:
+    """Commit id of HEAD, or "UNKNOWN" outside a repository / on an unborn branch."""
+    gdir = git_dir(repo)
+    head = _read(os.path.join(gdir, "HEAD")) if gdir else None
+    if not head:
+        return "UNKNOWN"
+    if head.startswith("ref:"):
+        return resolve_ref(gdir, head[4:].strip()) or "UNKNOWN"
+    return head
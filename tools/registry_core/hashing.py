@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Iterable
+
+CHUNK = 1024 * 1024
+
+def sha256_hex(b: bytes) -> str:
+    return hashlib.sha256(b).hexdigest()
+
+def sha256_iter(chunks: Iterable[bytes]) -> str:
+    # Streaming hasher: feed bytes as they arrive, never hold the whole body
+    h = hashlib.sha256()
+    for chunk in chunks:
+        h.update(chunk)
+    return h.hexdigest()
+
+def sha256_file(path: str) -> str:
+    with open(path, "rb") as f:
+        return sha256_iter(iter(lambda: f.read(CHUNK), b""))
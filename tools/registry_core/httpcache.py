@@ -0,0 +1,131 @@
+"""
+On-disk HTTP response cache for conditional GETs.
+
+Entries are keyed by sha256(url) and stored as <key>.body plus <key>.json
+(url, ETag, Last-Modified, size). HttpClient sends If-None-Match /
+If-Modified-Since from the entry and reuses the body on 304, so repeated
+sweeps mostly cost headers. Total body size is bounded; least recently used
+entries (by mtime, refreshed on every hit) are evicted first.
+
+REGISTRY_HTTP_CACHE sets the directory ("off" disables the cache);
+REGISTRY_HTTP_CACHE_MAX sets the bound in bytes.
+"""
+
+from __future__ import annotations
+
+import hashlib, json, os, threading
+
+DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "registry.parasks", "http")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+class CachedEntry:
+    def __init__(self, url: str, etag: str | None, last_modified: str | None, body: bytes):
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body = body
+
+    def conditional_headers(self) -> dict:
+        h = {}
+        if self.etag:
+            h["If-None-Match"] = self.etag
+        if self.last_modified:
+            h["If-Modified-Since"] = self.last_modified
+        return h
+
+class HttpCache:
+    def __init__(self, path: str = DEFAULT_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total = None  # bytes on disk, computed lazily
+        os.makedirs(path, exist_ok=True)
+
+    def _base(self, url: str) -> str:
+        return os.path.join(self.path, hashlib.sha256(url.encode("utf-8")).hexdigest())
+
+    def get(self, url: str) -> CachedEntry | None:
+        base = self._base(url)
+        try:
+            with open(base + ".json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(base + ".body", "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url or meta.get("size") != len(body):
+            return None
+        return CachedEntry(url, meta.get("etag"), meta.get("lastModified"), body)
+
+    def touch(self, url: str) -> None:
+        # Mark as recently used for LRU eviction
+        try:
+            os.utime(self._base(url) + ".body")
+        except OSError:
+            pass
+
+    def put(self, url: str, headers, body: bytes) -> None:
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return  # nothing to revalidate with
+        base = self._base(url)
+        tmp = f"{base}.{os.getpid()}.{threading.get_ident()}.tmp"
+        old = 0
+        try:
+            old = os.path.getsize(base + ".body")
+        except OSError:
+            pass
+        with open(tmp, "wb") as f:
+            f.write(body)
+        os.replace(tmp, base + ".body")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"url": url, "etag": etag, "lastModified": last_modified, "size": len(body)}, f)
+        os.replace(tmp, base + ".json")
+        with self._lock:
+            if self._total is None:
+                self._total = self._scan_total()
+            else:
+                self._total += len(body) - old
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _bodies(self) -> list[tuple[os.DirEntry, os.stat_result]]:
+        # Other processes sharing the cache may evict entries under us: skip those
+        out = []
+        for e in os.scandir(self.path):
+            if not e.name.endswith(".body"):
+                continue
+            try:
+                out.append((e, e.stat()))
+            except FileNotFoundError:
+                continue
+        return out
+
+    def _scan_total(self) -> int:
+        return sum(st.st_size for _, st in self._bodies())
+
+    def _evict(self) -> None:
+        # Drop least recently used entries until we are under 90% of the bound
+        target = int(self.max_bytes * 0.9)
+        entries = sorted(self._bodies(), key=lambda es: es[1].st_mtime_ns)
+        for e, st in entries:
+            if self._total <= target:
+                break
+            base = e.path[:-len(".body")]
+            for suffix in (".body", ".json"):
+                try:
+                    os.remove(base + suffix)
+                except OSError:
+                    pass  # already evicted by another process
+            self._total -= st.st_size
+
+def default_cache() -> HttpCache | None:
+    path = os.environ.get("REGISTRY_HTTP_CACHE", DEFAULT_DIR)
+    if path.lower() in ("", "0", "off", "none"):
+        return None
+    max_bytes = int(os.environ.get("REGISTRY_HTTP_CACHE_MAX", DEFAULT_MAX_BYTES))
+    try:
+        return HttpCache(path, max_bytes)
+    except OSError:
+        return None
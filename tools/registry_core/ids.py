@@ -0,0 +1,225 @@
+"""
+Identifier index (manifests/ids.json): which IDs are issued, without
+scanning data/.
+
+Per prefix letter the index keeps a high-water mark and a bitmap of taken
+numbers (bit n of the little-endian bitmap = number n, base64-encoded).
+A number is taken once it is allocated or reserved and stays taken for
+good - the genesis rules forbid reuse - so a deleted record or an
+abandoned reservation never frees its number:
+
+    {"rules": {"reuse": "forbidden"},
+     "prefixes": {"E": {"highWater": 4, "count": 4, "bitmap": "Hg=="}},
+     "reserved": {"E000005": {"time": ..., "note": ...}},   # taken, no data/ file yet
+     "retired":  ["E000009"]}                                # taken, file gone
+
+Issued IDs are the taken ones that are neither reserved nor retired;
+list_ids() returns them sorted without touching data/. sync() is the only
+directory scan that changes the index: it turns reservations whose file now
+exists into issued IDs and registers hand-added files; unsynced() is the
+read-only listing behind `build_api_v1.py --check-ids`.
+
+Every read-modify-write holds an exclusive flock on .build/ids.lock and
+replaces the file atomically, so parallel issuers never hand out the same
+number and readers never see a half-written index. Updates are written
+directly, never through output_txn: the lock must cover the write.
+"""
+
+from __future__ import annotations
+
+import base64, fcntl, glob, os, re
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from .jsonio import json_bytes, load_json
+
+INDEX_PATH = "manifests/ids.json"
+LOCK_PATH = ".build/ids.lock"
+DATA_DIR = "data"
+DIGITS = 6
+MAX_NUMBER = 10 ** DIGITS - 1
+_RID_RE = re.compile(r"^([A-Z])(\d{6})$")
+
+def split_id(rid: str) -> tuple[str, int]:
+    m = _RID_RE.match(rid)
+    if not m:
+        raise ValueError(f"not a registry ID: {rid!r}")
+    return m.group(1), int(m.group(2))
+
+def format_id(prefix: str, n: int) -> str:
+    return f"{prefix}{n:0{DIGITS}d}"
+
+def scan_data(data_dir: str = DATA_DIR) -> list[str]:
+    """Record IDs present in data_dir, sorted (the directory scan the index replaces)."""
+    names = (os.path.basename(p)[:-len(".jsonld")] for p in glob.glob(os.path.join(data_dir, "*.jsonld")))
+    return sorted(n for n in names if _RID_RE.match(n))
+
+def _now() -> str:
+    return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+class Bitmap:
+    def __init__(self, data: bytes = b""):
+        self.bits = bytearray(data)
+
+    @classmethod
+    def decode(cls, text: str) -> "Bitmap":
+        return cls(base64.b64decode(text))
+
+    def encode(self) -> str:
+        return base64.b64encode(bytes(self.bits.rstrip(b"\0"))).decode("ascii")
+
+    def __contains__(self, n: int) -> bool:
+        i = n >> 3
+        return i < len(self.bits) and bool(self.bits[i] >> (n & 7) & 1)
+
+    def add(self, n: int) -> None:
+        i = n >> 3
+        if i >= len(self.bits):
+            self.bits.extend(bytes(i + 1 - len(self.bits)))
+        self.bits[i] |= 1 << (n & 7)
+
+    def __iter__(self):
+        # Skip empty bytes whole; dense registries are mostly 0xff bytes
+        for i, b in enumerate(self.bits):
+            if b == 0xFF:
+                yield from range(i << 3, (i << 3) + 8)
+            elif b:
+                for j in range(8):
+                    if b >> j & 1:
+                        yield (i << 3) | j
+
+class IdIndex:
+    def __init__(self, doc: dict | None = None):
+        doc = doc or {}
+        self.prefixes = {p: Bitmap.decode(v.get("bitmap", "")) for p, v in doc.get("prefixes", {}).items()}
+        self.high = {p: v.get("highWater", 0) for p, v in doc.get("prefixes", {}).items()}
+        self.reserved: dict[str, dict] = dict(doc.get("reserved", {}))
+        self.retired: set[str] = set(doc.get("retired", []))
+
+    @classmethod
+    def load(cls, path: str = INDEX_PATH) -> "IdIndex":
+        return cls(load_json(path) if os.path.isfile(path) else None)
+
+    def doc(self) -> dict:
+        prefixes = {}
+        for p in sorted(self.prefixes):
+            bm = self.prefixes[p]
+            prefixes[p] = {"highWater": self.high[p], "count": sum(1 for _ in bm), "bitmap": bm.encode()}
+        return {
+            "registry": "registry.parasks",
+            "rules": {"reuse": "forbidden"},
+            "bitmapEncoding": f"base64, little-endian: bit n set = number n taken (allocated, reserved or issued); IDs are PREFIX + {DIGITS} digits",
+            "prefixes": prefixes,
+            "reserved": dict(sorted(self.reserved.items())),
+            "retired": sorted(self.retired),
+        }
+
+    def taken(self, rid: str) -> bool:
+        prefix, n = split_id(rid)
+        return n in self.prefixes.get(prefix, ())
+
+    def _take(self, rid: str) -> None:
+        prefix, n = split_id(rid)
+        self.prefixes.setdefault(prefix, Bitmap()).add(n)
+        self.high[prefix] = max(self.high.get(prefix, 0), n)
+
+    def ids(self, prefixes: list[str] | None = None) -> list[str]:
+        """Issued IDs, sorted: taken, not reserved, not retired."""
+        skip = self.retired | set(self.reserved)
+        out = []
+        for p in sorted(prefixes or self.prefixes):
+            out.extend(rid for rid in (format_id(p, n) for n in self.prefixes.get(p, ())) if rid not in skip)
+        return out
+
+    def allocate(self, prefix: str, count: int = 1, note: str | None = None) -> list[str]:
+        """Reserve the next `count` numbers above the high-water mark (gaps are never back-filled)."""
+        if not re.fullmatch(r"[A-Z]", prefix):
+            raise ValueError(f"prefix must be one letter A-Z: {prefix!r}")
+        start = self.high.get(prefix, 0) + 1
+        if start + count - 1 > MAX_NUMBER:
+            raise ValueError(f"prefix {prefix} is exhausted (high water {start - 1})")
+        return self.reserve([format_id(prefix, n) for n in range(start, start + count)], note)
+
+    def reserve(self, rids: list[str], note: str | None = None) -> list[str]:
+        """Reserve specific IDs; each must never have been taken."""
+        for rid in rids:
+            if self.taken(rid):
+                raise ValueError(f"{rid} was already taken (reuse is forbidden)")
+        now = _now()
+        for rid in rids:
+            self._take(rid)
+            self.reserved[rid] = {"time": now, **({"note": note} if note else {})}
+        return rids
+
+    def claim(self, rids: list[str], note: str | None = None) -> list[str]:
+        """
+        Make IDs writable by a generator: untaken ones are reserved, reserved
+        and issued ones (a refreshed record) are kept, retired ones refused.
+        Returns the IDs newly reserved.
+        """
+        for rid in rids:
+            split_id(rid)
+            if rid in self.retired:
+                raise ValueError(f"{rid} was retired (reuse is forbidden)")
+        return self.reserve([rid for rid in rids if not self.taken(rid)], note)
+
+    def issue(self, rids: list[str]) -> None:
+        """Mark reserved IDs whose data/ file has now been written as issued."""
+        for rid in rids:
+            self.reserved.pop(rid, None)
+
+    def sync(self, present: list[str]) -> dict[str, list[str]]:
+        """Reconcile with the IDs that have a data/ file; returns what changed."""
+        have = set(present)
+        out = {"issued": [], "registered": [], "retired": []}
+        for rid in present:
+            if rid in self.reserved:
+                del self.reserved[rid]
+                out["issued"].append(rid)
+            elif rid in self.retired:
+                raise ValueError(f"{rid} was retired and has reappeared in {DATA_DIR}/ (reuse is forbidden)")
+            elif not self.taken(rid):
+                self._take(rid)
+                out["registered"].append(rid)
+        for rid in self.ids():
+            if rid not in have:
+                self.retired.add(rid)
+                out["retired"].append(rid)
+        return out
+
+def _write(path: str, doc: dict) -> None:
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(json_bytes(doc))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+@contextmanager
+def locked_index(path: str = INDEX_PATH, lock_path: str = LOCK_PATH):
+    """Exclusive read-modify-write of the index; the file is rewritten on clean exit."""
+    os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+    with open(lock_path, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            index = IdIndex.load(path)
+            yield index
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            _write(path, index.doc())
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def unsynced(ids: list[str], data_dir: str = DATA_DIR) -> list[str]:
+    """IDs with a data/ file that are missing from `ids` (added since the last sync), sorted."""
+    known = set(ids)
+    return [rid for rid in scan_data(data_dir) if rid not in known]
+
+def list_ids(prefixes: list[str] | None = None, path: str = INDEX_PATH) -> list[str]:
+    """
+    Issued IDs, sorted, from the index; falls back to scanning data/ in trees
+    that have no index yet (run `python3 tools/reg_ids.py sync` to create it).
+    """
+    if not os.path.isfile(path):
+        ids = scan_data()
+        return [r for r in ids if r[0] in prefixes] if prefixes else ids
+    return IdIndex.load(path).ids(prefixes)
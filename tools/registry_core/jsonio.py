@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import json, os
+
+from . import txn
+from .profile import count, stage
+
+def load_json(path: str) -> dict:
+    with stage("parse"), open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def json_bytes(obj) -> bytes:
+    # Published layout: indent=2, UTF-8, trailing newline
+    with stage("serialize"):
+        return (json.dumps(obj, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+
+def _open_tmp(path: str, mode: str, **kw):
+    tmp = txn.tmp_for(path)
+    os.makedirs(os.path.dirname(tmp) or ".", exist_ok=True)
+    return tmp, open(tmp, mode, **kw)
+
+def write_bytes(path: str, b: bytes) -> bool:
+    # Returns True if the file was (re)written; unchanged bytes are left untouched
+    with stage("write"):
+        try:
+            # Inside a transaction a path written earlier is compared with its staged copy
+            with open(txn.read_path(path), "rb") as f:
+                if f.read() == b:
+                    count("files-unchanged")
+                    return False
+        except FileNotFoundError:
+            pass
+        tmp, f = _open_tmp(path, "wb")
+        with f:
+            f.write(b)
+        changed = txn.finish(path, tmp)
+    count("files-written" if changed else "files-unchanged")
+    return changed
+
+def write_json(path: str, obj) -> bool:
+    return write_bytes(path, json_bytes(obj))
+
+def _indent(s: str, pad: str) -> str:
+    return s.replace("\n", "\n" + pad)
+
+def iter_json_doc(head: dict, key: str, items, mapping: bool, compact: bool = False):
+    """
+    Yield str chunks of the document {**head, key: <collection>} without building it.
+
+    items yields (k, v) pairs when mapping is True, plain values otherwise.
+    The default layout is byte-identical to json_bytes(); compact=True uses
+    minimal separators and no newlines except the trailing one.
+    """
+    if compact:
+        dump = lambda o: json.dumps(o, separators=(",", ":"), ensure_ascii=False)
+        yield dump(head)[:-1] + ("," if head else "") + dump(key) + ":" + ("{" if mapping else "[")
+        sep = ""
+        for it in items:
+            yield sep + (dump(it[0]) + ":" + dump(it[1]) if mapping else dump(it))
+            sep = ","
+        yield ("}" if mapping else "]") + "}\n"
+        return
+
+    dump = lambda o: json.dumps(o, indent=2, ensure_ascii=False)
+    out = "{"
+    for k, v in head.items():
+        out += "\n  " + dump(k) + ": " + _indent(dump(v), "  ") + ","
+    yield out + "\n  " + dump(key) + ": "
+    open_, close = ("{", "}") if mapping else ("[", "]")
+    sep = open_
+    for it in items:
+        entry = dump(it[0]) + ": " + dump(it[1]) if mapping else dump(it)
+        yield sep + "\n    " + _indent(entry, "    ")
+        sep = ","
+    # json.dumps renders an empty collection as {} / [] on one line
+    yield (open_ + close if sep == open_ else "\n  " + close) + "\n}\n"
+
+def write_chunks(path: str, chunks) -> bool:
+    """Stream str chunks to path via a temp file; returns True if the file changed."""
+    tmp, f = _open_tmp(path, "w", encoding="utf-8", newline="\n")
+    with f:
+        for c in chunks:
+            f.write(c)
+    return txn.finish(path, tmp)
+
+def write_json_stream(path: str, head: dict, key: str, items, mapping: bool = True, compact: bool = False) -> bool:
+    return write_chunks(path, iter_json_doc(head, key, items, mapping, compact))
@@ -0,0 +1,38 @@
+"""
+Two-level Merkle index over the sealed manifest.
+
+    leaf  = sha256("leaf:" + ID + ":" + contentHash)
+    shard = sha256("node:" + leaf_1 + leaf_2 + ...)      leaves sorted by ID
+    root  = sha256("root:" + key_1 + ":" + shard_1 + ...) shards sorted by key
+
+Hashes are lowercase hex. A verifier that remembers the last root it
+checked only needs to fetch the shards whose hash changed, then only the
+records whose leaf changed within them.
+"""
+
+from __future__ import annotations
+
+from .hashing import sha256_hex
+from .shards import group_by_shard
+
+def leaf_hash(rid: str, content_hash: str) -> str:
+    return sha256_hex(f"leaf:{rid}:{content_hash}".encode("utf-8"))
+
+def node_hash(leaves: list[str]) -> str:
+    return sha256_hex(("node:" + "".join(leaves)).encode("utf-8"))
+
+def root_hash(shard_hashes: dict[str, str]) -> str:
+    s = "".join(f"{k}:{shard_hashes[k]}" for k in sorted(shard_hashes))
+    return sha256_hex(("root:" + s).encode("utf-8"))
+
+def shard_hash(records: dict[str, str]) -> str:
+    # records: {ID: contentHash} for one shard
+    return node_hash([leaf_hash(rid, records[rid]) for rid in sorted(records)])
+
+def build_tree(records: dict[str, str]) -> tuple[str, dict[str, dict]]:
+    """records: {ID: contentHash} -> (root, {shardKey: {"hash", "records"}})."""
+    shards = {}
+    for key, ids in group_by_shard(sorted(records)).items():
+        recs = {rid: records[rid] for rid in ids}
+        shards[key] = {"hash": shard_hash(recs), "records": recs}
+    return root_hash({k: v["hash"] for k, v in shards.items()}), shards
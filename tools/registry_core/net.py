@@ -0,0 +1,211 @@
+"""
+Keep-alive HTTP client shared by the remote tools.
+
+urllib.request opens a fresh TCP+TLS connection per call; HttpClient keeps
+one persistent connection per (thread, scheme, host) and reuses it. Errors
+are raised as urllib.error.HTTPError so existing retry code keeps working.
+Responses are revalidated against the on-disk cache in httpcache.
+
+Proxies are taken from urllib.request.getproxies() (HTTP_PROXY, HTTPS_PROXY,
+NO_PROXY, ...) as urllib would: https goes through a CONNECT tunnel, plain
+http sends absolute URIs to the proxy. The registry base URL is
+REGISTRY_BASE (default: the published site).
+"""
+
+from __future__ import annotations
+
+import base64, http.client, json, os, threading, time, urllib.error, urllib.parse, urllib.request
+from email.message import Message
+from email.utils import parsedate_to_datetime
+
+from .httpcache import HttpCache, default_cache
+from .profile import count, stage
+
+BASE = os.environ.get("REGISTRY_BASE", "https://napier369.github.io/registry.parasks").rstrip("/")
+USER_AGENT = "registry.parasks client"
+MAX_REDIRECTS = 5
+
+class Response:
+    def __init__(self, url: str, status: int, headers: Message, body: bytes):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body.decode("utf-8"))
+
+def _headers_msg(resp: http.client.HTTPResponse) -> Message:
+    m = Message()
+    for k, v in resp.getheaders():
+        m[k] = v
+    return m
+
+class HttpClient:
+    def __init__(self, user_agent: str = USER_AGENT, timeout: float = 30.0,
+                 cache: HttpCache | bool | None = True):
+        self.user_agent = user_agent
+        self.timeout = timeout
+        # True = environment-configured default cache, None/False = no cache
+        self.cache = default_cache() if cache is True else (cache or None)
+        self.proxies = urllib.request.getproxies()
+        self._local = threading.local()
+
+    def _conns(self) -> dict:
+        c = getattr(self._local, "conns", None)
+        if c is None:
+            c = self._local.conns = {}
+        return c
+
+    def _proxy(self, scheme: str, netloc: str) -> urllib.parse.SplitResult | None:
+        proxy = self.proxies.get(scheme)
+        host = urllib.parse.urlsplit(f"//{netloc}").hostname or netloc
+        if not proxy or urllib.request.proxy_bypass(host):
+            return None
+        return urllib.parse.urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+
+    def _conn(self, scheme: str, netloc: str) -> tuple[http.client.HTTPConnection, dict | None]:
+        """(connection, proxy headers if requests go to a plain-http proxy as absolute URIs, else None)."""
+        conns = self._conns()
+        key = (scheme, netloc)
+        entry = conns.get(key)
+        if entry is None:
+            proxy = self._proxy(scheme, netloc)
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            if proxy is None:
+                entry = (cls(netloc, timeout=self.timeout), None)
+            else:
+                auth = {}
+                if proxy.username:
+                    cred = f"{urllib.parse.unquote(proxy.username)}:{urllib.parse.unquote(proxy.password or '')}"
+                    auth["Proxy-Authorization"] = "Basic " + base64.b64encode(cred.encode("utf-8")).decode("ascii")
+                conn = cls(proxy.hostname, proxy.port, timeout=self.timeout)
+                if scheme == "https":
+                    conn.set_tunnel(netloc, headers=auth)
+                    entry = (conn, None)
+                else:
+                    entry = (conn, auth)
+            conns[key] = entry
+        return entry
+
+    def _drop(self, scheme: str, netloc: str) -> None:
+        entry = self._conns().pop((scheme, netloc), None)
+        if entry is not None:
+            entry[0].close()
+
+    def _once(self, url: str, headers: dict) -> Response:
+        u = urllib.parse.urlsplit(url)
+        path = u.path or "/"
+        if u.query:
+            path += "?" + u.query
+        hdrs = {"User-Agent": self.user_agent, "Accept-Encoding": "identity", **headers}
+        # A kept-alive socket may have been closed by the server; retry once on a fresh one
+        for attempt in (0, 1):
+            conn, via_proxy = self._conn(u.scheme, u.netloc)
+            try:
+                with stage("fetch"):
+                    if via_proxy is not None:
+                        conn.request("GET", f"{u.scheme}://{u.netloc}{path}", headers={**hdrs, **via_proxy})
+                    else:
+                        conn.request("GET", path, headers=hdrs)
+                    resp = conn.getresponse()
+                    body = resp.read()
+                count("http-requests")
+                count("http-bytes", len(body))
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError,
+                    http.client.CannotSendRequest, http.client.BadStatusLine):
+                self._drop(u.scheme, u.netloc)
+                if attempt:
+                    raise
+                continue
+            except Exception:
+                self._drop(u.scheme, u.netloc)
+                raise
+            if resp.will_close:
+                self._drop(u.scheme, u.netloc)
+            return Response(url, resp.status, _headers_msg(resp), body)
+        raise AssertionError("unreachable")
+
+    def request(self, url: str, headers: dict | None = None) -> Response:
+        """GET url following redirects; returns any status < 400, raises HTTPError otherwise."""
+        headers = headers or {}
+        for _ in range(MAX_REDIRECTS + 1):
+            cached = self.cache.get(url) if self.cache else None
+            r = self._once(url, {**cached.conditional_headers(), **headers} if cached else headers)
+            if r.status in (301, 302, 303, 307, 308) and r.headers.get("Location"):
+                url = urllib.parse.urljoin(url, r.headers["Location"])
+                continue
+            if r.status == 304 and cached:
+                count("http-not-modified")
+                self.cache.touch(url)
+                return Response(url, 200, r.headers, cached.body)
+            if r.status >= 400:
+                raise urllib.error.HTTPError(url, r.status, http.client.responses.get(r.status, ""), r.headers, None)
+            if r.status == 200 and self.cache:
+                self.cache.put(url, r.headers, r.body)
+            return r
+        raise urllib.error.HTTPError(url, 310, "too many redirects", Message(), None)
+
+    def get_bytes(self, url: str) -> bytes:
+        return self.request(url).body
+
+    def get_json(self, url: str):
+        return self.request(url).json()
+
+    def close(self) -> None:
+        for conn, _ in self._conns().values():
+            conn.close()
+        self._conns().clear()
+
+class RateLimiter:
+    """
+    Process-wide request pacing shared by all worker threads.
+
+    wait() spaces requests to at most `rate` per second (0 = unlimited) and
+    blocks while a server-imposed pause (429/503 Retry-After) is in effect.
+    """
+
+    def __init__(self, rate: float = 0.0):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+        self._paused_until = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            at = max(now, self._next, self._paused_until)
+            self._next = at + self.interval
+        if at > now:
+            with stage("rate-wait"):
+                time.sleep(at - now)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+def retry_after(headers) -> float | None:
+    # Retry-After is either delta-seconds or an HTTP-date
+    v = headers.get("Retry-After") if headers is not None else None
+    if not v:
+        return None
+    v = v.strip()
+    if v.isdigit():
+        return float(v)
+    try:
+        return max(0.0, parsedate_to_datetime(v).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+_default = None
+
+def default_client() -> HttpClient:
+    global _default
+    if _default is None:
+        _default = HttpClient()
+    return _default
+
+def http_get_json(url_or_path: str, client: HttpClient | None = None):
+    # Paths ("/api/v1/...") are resolved against BASE
+    url = BASE + url_or_path if url_or_path.startswith("/") else url_or_path
+    return (client or default_client()).get_json(url)
@@ -0,0 +1,138 @@
+"""
+Opt-in instrumentation for the tools.
+
+Off by default; turned on by REGISTRY_PROFILE=json|cprofile (any other
+non-empty value means json) or by a `--profile[=json|cprofile]` argument
+picked up through setup(). When off, stage() returns a shared no-op
+context manager and count()/observe() return at once.
+
+json mode times named stages (ids, parse, canonicalize, hash, serialize,
+write, fetch, retry-sleep, ...) and keeps, per stage, a call count, total
+and max seconds and a histogram of durations in power-of-two millisecond
+buckets, plus free-form counters. cprofile mode runs cProfile over the
+whole process instead. The report is written at exit to
+REGISTRY_PROFILE_OUT or .build/profile/<tool>.json (.prof for cProfile,
+readable with `python3 -m pstats`), never to stdout.
+
+Timings are per process: work done in --jobs pool workers is not
+collected; run with --jobs 1 to see the per-record stages.
+"""
+
+from __future__ import annotations
+
+import atexit, contextlib, json, math, os, sys, threading, time
+
+ENV = "REGISTRY_PROFILE"
+ENV_OUT = "REGISTRY_PROFILE_OUT"
+OUT_DIR = ".build/profile"
+
+_NULL = contextlib.nullcontext()
+_lock = threading.Lock()
+_stages: dict[str, dict] = {}
+_counters: dict[str, int] = {}
+_mode = None
+_tool = None
+_t0 = 0.0
+
+def enabled() -> bool:
+    return _mode == "json"
+
+def bucket(seconds: float) -> str:
+    # Upper bound in ms of the power-of-two bucket: "<=1ms", "<=2ms", "<=4ms", ...
+    ms = seconds * 1000.0
+    return f"<={1 if ms <= 1 else 2 ** math.ceil(math.log2(ms))}ms"
+
+def observe(name: str, seconds: float) -> None:
+    if _mode != "json":
+        return
+    b = bucket(seconds)
+    with _lock:
+        s = _stages.get(name)
+        if s is None:
+            s = _stages[name] = {"count": 0, "seconds": 0.0, "maxSeconds": 0.0, "histogram": {}}
+        s["count"] += 1
+        s["seconds"] += seconds
+        if seconds > s["maxSeconds"]:
+            s["maxSeconds"] = seconds
+        s["histogram"][b] = s["histogram"].get(b, 0) + 1
+
+def count(name: str, n: int = 1) -> None:
+    if _mode != "json":
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+class _Stage:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.t0)
+        return False
+
+def stage(name: str):
+    """`with stage("write"): ...` times the block when profiling is on."""
+    return _Stage(name) if _mode == "json" else _NULL
+
+def report() -> dict:
+    with _lock:
+        stages = {k: {**v, "seconds": round(v["seconds"], 6), "maxSeconds": round(v["maxSeconds"], 6),
+                      "histogram": dict(sorted(v["histogram"].items(), key=lambda kv: int(kv[0][2:-2])))}
+                  for k, v in sorted(_stages.items())}
+        counters = dict(sorted(_counters.items()))
+    return {
+        "tool": _tool,
+        "pid": os.getpid(),
+        "wallSeconds": round(time.perf_counter() - _t0, 6),
+        "stages": stages,
+        "counters": counters,
+    }
+
+def _out_path(ext: str) -> str:
+    return os.environ.get(ENV_OUT) or os.path.join(OUT_DIR, f"{_tool}{ext}")
+
+def enable(mode: str = "json", tool: str | None = None) -> None:
+    """Start collecting (once per process) and write the report at exit."""
+    global _mode, _tool, _t0
+    if _mode is not None:
+        return
+    _mode = "cprofile" if mode == "cprofile" else "json"
+    _tool = tool or os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0]
+    _t0 = time.perf_counter()
+    if _mode == "cprofile":
+        import cProfile
+        prof = cProfile.Profile()
+        prof.enable()
+
+        def dump():
+            prof.disable()
+            path = _out_path(".prof")
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            prof.dump_stats(path)
+            print(f"PROFILE: wrote {path}", file=sys.stderr)
+    else:
+        def dump():
+            path = _out_path(".json")
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report(), f, indent=2)
+                f.write("\n")
+            print(f"PROFILE: wrote {path}", file=sys.stderr)
+    atexit.register(dump)
+
+def setup(argv: list[str], tool: str | None = None) -> None:
+    """Remove `--profile` / `--profile=MODE` from argv; enable from it or from REGISTRY_PROFILE."""
+    mode = None
+    for a in list(argv):
+        if a == "--profile" or a.startswith("--profile="):
+            mode = a.partition("=")[2] or "json"
+            argv.remove(a)
+    mode = mode or os.environ.get(ENV)
+    if mode and mode != "0":
+        enable(mode, tool)
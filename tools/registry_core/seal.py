@@ -0,0 +1,91 @@
+"""
+Sealing stage: seal many records, optionally on a process pool.
+
+Used by build_api_v1.py, reg_reseal.py and issue_check.py so that full
+rebuilds and bulk reseals scale with core count.
+"""
+
+from __future__ import annotations
+
+import json, os
+from concurrent.futures import ProcessPoolExecutor
+
+from .canon import seal_obj
+from .jsonio import json_bytes
+from .profile import stage
+from .search import record_terms
+
+MAX_CHUNK = 256
+
+def seal_path(path: str) -> str:
+    with stage("parse"), open(path, "r", encoding="utf-8") as f:
+        obj = json.load(f)
+    return seal_obj(obj)
+
+def _seal_one(item: tuple[str, str]) -> tuple[str, str]:
+    rid, path = item
+    return rid, seal_path(path)
+
+def _seal_terms_one(item: tuple[str, str]) -> tuple[str, str, dict]:
+    # One parse yields both the sealed hash and the search terms
+    rid, path = item
+    with stage("parse"), open(path, "r", encoding="utf-8") as f:
+        obj = json.load(f)
+    return rid, seal_obj(obj), record_terms(obj)
+
+def _reseal_one(item: tuple[str, str]) -> tuple[str, str, bytes | None]:
+    # Read once; new bytes only when the stored hash is stale
+    rid, path = item
+    with stage("parse"), open(path, "r", encoding="utf-8") as f:
+        obj = json.load(f)
+    ch = seal_obj(obj)
+    if obj.get("contentHash") == ch:
+        return rid, ch, None
+    obj["contentHash"] = ch
+    return rid, ch, json_bytes(obj)
+
+def _pool_map(fn, items: list, jobs: int):
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if jobs == 1 or len(items) < 2:
+        yield from map(fn, items)
+        return
+    chunk = min(MAX_CHUNK, max(1, len(items) // (jobs * 8)))
+    # Submit a bounded window at a time so a slow consumer does not let every result pile up
+    window = chunk * jobs * 4
+    with ProcessPoolExecutor(max_workers=jobs) as ex:
+        for i in range(0, len(items), window):
+            # map() preserves input order, so output is deterministic
+            yield from ex.map(fn, items[i:i + window], chunksize=chunk)
+
+def seal_ids(ids, jobs: int = 1, data_dir: str = "data") -> list[tuple[str, str]]:
+    """Seal data/{ID}.jsonld for each ID; returns [(ID, "sha256:<hex>")] sorted by ID."""
+    items = [(rid, os.path.join(data_dir, f"{rid}.jsonld")) for rid in sorted(ids)]
+    return list(_pool_map(_seal_one, items, jobs))
+
+def seal_terms_ids(ids, jobs: int = 1, data_dir: str = "data"):
+    """Yield (ID, sealed contentHash, record_terms) sorted by ID, parsing each record once."""
+    items = [(rid, os.path.join(data_dir, f"{rid}.jsonld")) for rid in sorted(ids)]
+    yield from _pool_map(_seal_terms_one, items, jobs)
+
+def reseal_ids(ids, jobs: int = 1, data_dir: str = "data"):
+    """Yield (ID, sealed contentHash, new file bytes or None if already sealed) sorted by ID."""
+    items = [(rid, os.path.join(data_dir, f"{rid}.jsonld")) for rid in sorted(ids)]
+    yield from _pool_map(_reseal_one, items, jobs)
+
+def pop_jobs(argv: list[str], default: int = 1) -> int:
+    """Remove `--jobs N` / `--jobs=N` from argv and return N (0 = all cores)."""
+    jobs = default
+    i = 0
+    while i < len(argv):
+        a = argv[i]
+        if a == "--jobs" and i + 1 < len(argv):
+            jobs = int(argv[i + 1])
+            del argv[i:i + 2]
+            continue
+        if a.startswith("--jobs="):
+            jobs = int(a.split("=", 1)[1])
+            del argv[i]
+            continue
+        i += 1
+    return jobs
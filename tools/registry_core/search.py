@@ -0,0 +1,78 @@
+"""
+Static inverted search index (tags and label words).
+
+Terms are lowercased runs of letters/digits. Each term lives in the shard
+named after its first KEY_CHARS characters, so one lookup is one small
+fetch:
+
+    /api/v1/search/tags/{KEY}.json    {"tags":  {"physics": ["E000003", ...]}}
+    /api/v1/search/labels/{KEY}.json  {"words": {"einstein": ["E000003"]}}
+
+A label prefix query ("eins") fetches the shard of its first KEY_CHARS
+characters and unions every word starting with the prefix, so prefixes
+must be at least KEY_CHARS long. Terms whose key is not plain [a-z0-9]
+share the "_" shard.
+"""
+
+from __future__ import annotations
+
+import re
+
+# 3 characters: up to 36**3 shards, so a shard stays small as the registry grows
+# (2 gave at most 1296, and common prefixes such as "co" would keep growing)
+KEY_CHARS = 3
+KINDS = {"tags": "tags", "labels": "words"}  # directory -> key inside the shard file
+
+_WORD_RE = re.compile(r"[^\W_]+")
+_KEY_RE = re.compile(r"[a-z0-9]+")
+
+def normalize(term: str) -> str:
+    return term.strip().casefold()
+
+def term_key(term: str) -> str:
+    k = term[:KEY_CHARS]
+    return k if _KEY_RE.fullmatch(k) else "_"
+
+def label_words(rec: dict) -> list[str]:
+    words = set()
+    for key in ("prefLabel", "rdfs:label"):
+        v = rec.get(key)
+        for text in (v.values() if isinstance(v, dict) else [v] if isinstance(v, str) else []):
+            words.update(_WORD_RE.findall(text.casefold()))
+    return sorted(words)
+
+def query_terms(kind: str, query: str) -> list[str]:
+    # "Albert Eins" -> ["albert", "eins"] for labels; tags are matched whole
+    return _WORD_RE.findall(query.casefold()) if kind == "labels" else [normalize(query)]
+
+def record_terms(rec: dict) -> dict[str, list[str]]:
+    tags = rec.get("tags") or rec.get("registry:tags") or []
+    return {"tags": sorted({normalize(t) for t in tags if isinstance(t, str) and t.strip()}),
+            "labels": label_words(rec)}
+
+def new_index() -> dict[str, dict]:
+    return {kind: {} for kind in KINDS}
+
+def add_terms(index: dict[str, dict], rid: str, terms: dict[str, list[str]]) -> None:
+    """Add one record's postings; records must be added in ID order."""
+    for kind in KINDS:
+        for term in terms.get(kind, []):
+            index[kind].setdefault(term_key(term), {}).setdefault(term, []).append(rid)
+
+def sorted_index(index: dict[str, dict]) -> dict[str, dict[str, dict[str, list[str]]]]:
+    return {kind: {k: dict(sorted(shard.items())) for k, shard in sorted(shards.items())}
+            for kind, shards in index.items()}
+
+def build_index(terms: dict[str, dict]) -> dict[str, dict[str, dict[str, list[str]]]]:
+    """{ID: record_terms(...)} in ID order -> {kind: {KEY: {term: [IDs]}}} with sorted keys."""
+    out = new_index()
+    for rid, t in terms.items():
+        add_terms(out, rid, t)
+    return sorted_index(out)
+
+def match(kind: str, shard: dict, query: str) -> set[str]:
+    """IDs for query in one fetched shard: exact tag, or label-word prefix."""
+    entries = shard.get(KINDS[kind], {})
+    if kind == "tags":
+        return set(entries.get(query, []))
+    return {rid for word, ids in entries.items() if word.startswith(query) for rid in ids}
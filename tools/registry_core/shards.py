@@ -0,0 +1,21 @@
+"""
+Shard layout shared by the sharded API documents.
+
+IDs follow ^[A-Z]\\d{6}$; a shard is the prefix letter plus the first
+SHARD_DIGITS digits, e.g. E000003 -> "E000" (E000000..E000999).
+"""
+
+from __future__ import annotations
+
+SHARD_DIGITS = 3
+SHARD_SIZE = 10 ** (6 - SHARD_DIGITS)
+
+def shard_key(rid: str) -> str:
+    return rid[:1 + SHARD_DIGITS]
+
+def group_by_shard(ids) -> dict[str, list[str]]:
+    # ids must be sorted; shards and their members come out sorted
+    out: dict[str, list[str]] = {}
+    for rid in ids:
+        out.setdefault(shard_key(rid), []).append(rid)
+    return out
@@ -0,0 +1,12 @@
+"""
+Small string helpers shared by the generators and the Wikipedia deriver.
+"""
+
+import re
+
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+def slugify(title: str) -> str:
+    # For filenames/paths only (not identifiers)
+    s = _SLUG_RE.sub("-", title.strip().lower()).strip("-")
+    return s or "page"
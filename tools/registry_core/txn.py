@@ -0,0 +1,181 @@
+"""
+Crash-safe output stage for generated files.
+
+Inside `with output_txn():` every write made through jsonio/export is
+written to a mirror path under the staging directory and fsynced; the
+published tree is not touched. On success a journal listing the staged
+files is fsynced, then each file is renamed over its target (atomic per
+file) and the journal removed. A crash before the journal leaves the old
+tree intact; a crash after it is rolled forward by the next run. Either
+way no reader ever sees a half-written manifest or bundle.
+
+Outside a transaction writes are still atomic per file (temp + rename).
+Files whose bytes are unchanged are never staged or rewritten; a path
+written twice in one transaction is compared with its staged copy. Removals
+(remove_file) are journalled the same way and applied in the same commit;
+a directory they leave empty is removed too.
+
+The staging directory is shared, so a transaction holds an exclusive flock
+on .build/staging.lock from recovery to commit: a second tool waits instead
+of discarding the first one's stage. A journalled file that is missing at
+commit time is an error, never a silent skip.
+"""
+
+from __future__ import annotations
+
+import fcntl, filecmp, json, os, shutil
+from contextlib import contextmanager
+
+STAGING = ".build/staging"
+LOCK_PATH = ".build/staging.lock"
+JOURNAL = "COMMIT.json"
+
+_current = None
+
+def _fsync_file(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _fsync_dir(path: str) -> None:
+    try:
+        _fsync_file(path or ".")
+    except OSError:
+        pass  # not supported on every platform/filesystem
+
+class OutputTxn:
+    def __init__(self, staging: str = STAGING):
+        self.staging = staging
+        self.staged: dict[str, str | None] = {}  # final path -> staged path (None = remove)
+
+    def mirror(self, path: str) -> str:
+        return os.path.join(self.staging, "files", os.path.normpath(path).lstrip(os.sep))
+
+    def tmp_for(self, path: str) -> str:
+        # A rewrite must not clobber the staged copy before finish() compares against it
+        mirror = self.mirror(path)
+        return mirror + ".rewrite" if path in self.staged else mirror
+
+    def add(self, path: str, tmp: str | None) -> None:
+        # tmp None stages the removal of path; a staged file always lives at its mirror path
+        if tmp is not None and tmp != self.mirror(path):
+            os.replace(tmp, self.mirror(path))
+            tmp = self.mirror(path)
+        self.staged[path] = tmp
+
+    def commit(self) -> int:
+        if not self.staged:
+            self.abort()
+            return 0
+        journal = os.path.join(self.staging, JOURNAL)
+        with open(journal + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(sorted(self.staged.items()), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(journal + ".tmp", journal)
+        _fsync_dir(self.staging)
+        n = _roll_forward(self.staging)
+        self.staged.clear()
+        return n
+
+    def abort(self) -> None:
+        shutil.rmtree(self.staging, ignore_errors=True)
+        self.staged.clear()
+
+def _roll_forward(staging: str, resume: bool = False) -> int:
+    """Apply the journal; resume=True after a crash, when some files may already be in place."""
+    journal = os.path.join(staging, JOURNAL)
+    with open(journal, "r", encoding="utf-8") as f:
+        pairs = json.load(f)
+    dirs, emptied = set(), set()
+    for path, tmp in pairs:
+        if tmp is None:
+            if os.path.lexists(path):
+                os.remove(path)
+                dirs.add(os.path.dirname(path))
+                emptied.add(os.path.dirname(path))
+        elif not os.path.exists(tmp):
+            # Only a crash mid-commit moves a file before its journal is removed
+            if not (resume and os.path.exists(path)):
+                raise RuntimeError(f"staged file for {path} is missing ({tmp}); output not committed")
+        else:
+            d = os.path.dirname(path)
+            if d:
+                os.makedirs(d, exist_ok=True)
+            os.replace(tmp, path)
+            dirs.add(d)
+    for d in sorted(emptied):
+        if d and not os.listdir(d):
+            os.rmdir(d)
+            dirs.discard(d)
+    for d in dirs:
+        _fsync_dir(d)
+    shutil.rmtree(staging, ignore_errors=True)
+    return len(pairs)
+
+def recover(staging: str = STAGING) -> int:
+    """Finish a commit interrupted by a crash; discard an uncommitted stage."""
+    if os.path.isfile(os.path.join(staging, JOURNAL)):
+        return _roll_forward(staging, resume=True)
+    shutil.rmtree(staging, ignore_errors=True)
+    return 0
+
+@contextmanager
+def output_txn(staging: str = STAGING, lock_path: str = LOCK_PATH):
+    global _current
+    if _current is not None:
+        yield _current  # nested: join the outer transaction
+        return
+    os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+    with open(lock_path, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            recover(staging)
+            txn = _current = OutputTxn(staging)
+            try:
+                yield txn
+                txn.commit()
+            except BaseException:
+                txn.abort()
+                raise
+            finally:
+                _current = None
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def read_path(path: str) -> str:
+    """Where path's current bytes live: its staged copy inside a transaction, else path itself."""
+    if _current is not None and path in _current.staged:
+        tmp = _current.staged[path]
+        return tmp if tmp is not None else os.path.join(_current.staging, "removed")
+    return path
+
+def remove_file(path: str) -> bool:
+    """Delete a generated file (staged like a write inside a transaction); False if it did not exist."""
+    if not os.path.lexists(path):
+        return False
+    if _current is not None:
+        _current.add(path, None)
+    else:
+        os.remove(path)
+    return True
+
+def tmp_for(path: str) -> str:
+    if _current is not None:
+        return _current.tmp_for(path)
+    return f"{path}.{os.getpid()}.tmp"
+
+def finish(path: str, tmp: str) -> bool:
+    """Publish a fully written tmp file as path; returns False (and drops tmp) if bytes are unchanged."""
+    current = read_path(path)
+    if os.path.isfile(current) and filecmp.cmp(current, tmp, shallow=False):
+        os.remove(tmp)
+        return False
+    _fsync_file(tmp)
+    if _current is not None:
+        _current.add(path, tmp)
+    else:
+        os.replace(tmp, path)
+    return True
@@ -3,6 +3,9 @@ set -euo pipefail
 
 cd "$(dirname "$0")/.."
 
+echo "== SYNC manifests/ids.json =="
+python3 tools/reg_ids.py sync
+
 echo "== BUILD api/v1 =="
 python3 tools/build_api_v1.py
 # Update API pointer so it always matches audit/logs/index.json (avoid cache/lag confusion)
@@ -33,9 +36,22 @@ git add \
   api/v1/index.json \
   api/v1/records.json \
   api/v1/manifest.json \
+  api/v1/manifest.bin \
   api/v1/capabilities.json \
+  manifests/ids.json \
+  api/v1/merkle \
+  api/v1/shards.json \
+  api/v1/shards \
+  api/v1/export/registry.ndjson.gz \
+  api/v1/search/index.json \
+  api/v1/search/*/*.json \
   api/v1/bundle/*.json
 
+# Audit snapshots (entries, pages, head) and their manifest deltas, once published
+for d in audit/logs api/v1/deltas; do
+  if [[ -d "$d" ]]; then git add "$d"; fi
+done
+
 git commit -m "Release API v1 (rebuild index/records/bundles/manifest)"
 git push
 echo "OK: released"
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Render page/{ID}/index.html and id/{ID}/index.html from data/*.jsonld.
+
+Usage:
+  python3 tools/render_pages.py [--jobs N] [--force] [<ID> ...]
+
+Templates live in tools/templates/ and are parsed once per process. A record
+is only rerendered when its data file (mtime/size) or either template changed
+since the last run (state in .build/pages_state.json), or an output is
+missing. Rendering runs on a process pool; writes go through one output
+transaction so a failed run publishes nothing.
+
+Pages without the generator marker are hand-maintained and are left alone
+unless --force is given.
+"""
+
+import html, os, sys
+from string import Template
+
+from registry_core import list_ids, load_json, output_txn, pop_jobs, profile, sha256_iter, slugify, write_bytes, write_json
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+TEMPLATES = ("page.html", "id.html")
+MARKER = b'<meta name="generator" content="tools/render_pages.py">'
+
+STATE_PATH = ".build/pages_state.json"
+STATE_VERSION = 1
+
+SITE = "https://registry.parasks/"
+ID_BASE = SITE + "id/"
+
+_compiled = None
+
+def templates() -> dict[str, Template]:
+    # Parsed once per process (pool workers included)
+    global _compiled
+    if _compiled is None:
+        _compiled = {}
+        for name in TEMPLATES:
+            with open(os.path.join(TEMPLATE_DIR, name), "r", encoding="utf-8") as f:
+                _compiled[name] = Template(f.read())
+    return _compiled
+
+def templates_digest() -> str:
+    def chunks():
+        for name in TEMPLATES:
+            with open(os.path.join(TEMPLATE_DIR, name), "rb") as f:
+                yield f.read()
+    return sha256_iter(chunks())
+
+def out_paths(rid: str) -> tuple[str, str]:
+    return f"page/{rid}/index.html", f"id/{rid}/index.html"
+
+def is_generated(path: str) -> bool:
+    with open(path, "rb") as f:
+        return MARKER in f.read(512)
+
+def first(rec: dict, *keys):
+    for k in keys:
+        if rec.get(k) is not None:
+            return rec[k]
+    return None
+
+def label(rec: dict, rid: str) -> str:
+    v = first(rec, "rdfs:label", "prefLabel")
+    if isinstance(v, dict):
+        v = v.get("en") or next(iter(v.values()), None)
+    return v or rid
+
+def id_link(ref) -> str | None:
+    # {"@id": "https://registry.parasks/id/A000001"} -> link to the local resolver page
+    iri = ref.get("@id", "") if isinstance(ref, dict) else ""
+    if not iri.startswith(ID_BASE):
+        return None
+    ref_id = html.escape(iri[len(ID_BASE):])
+    return f'<a href="../../id/{ref_id}/">{ref_id}</a>'
+
+def facts(rec: dict, rid: str) -> str:
+    e = html.escape
+    rows = [("Identifier", f'<a href="../../id/{rid}/">/id/{rid}</a>')]
+    t = rec.get("@type")
+    if t:
+        rows.append(("Type", e(" + ".join(t) if isinstance(t, list) else t)))
+    if rec.get("notation"):
+        rows.append(("Notation", e(rec["notation"])))
+    for key, name in (("registry:role", "Role"), ("registry:entityType", "Entity type"),
+                      ("registry:eventType", "Event type")):
+        if rec.get(key):
+            rows.append((name, e(str(rec[key]))))
+    for keys, name in ((("issuedBy",), "Issued by"), (("registry:actsFor",), "Acts for"),
+                       (("prov:wasAssociatedWith",), "Associated agent")):
+        a = id_link(first(rec, *keys))
+        if a:
+            rows.append((name, a))
+    issued = first(rec, "registry:issuedAt", "issuedAt")
+    if issued:
+        rows.append(("Issued at", e(issued)))
+    state = (rec.get("recordState") or {}).get("@id", "")
+    if "#" in state:
+        rows.append(("Record state", e(state.rsplit("#", 1)[1])))
+    conforms = (rec.get("dcterms:conformsTo") or {}).get("@id", "")
+    if conforms.startswith(SITE):
+        path = "/" + conforms[len(SITE):].rstrip("/") + "/"
+        rows.append(("Conforms to", f'<a href="../..{e(path)}">{e(path)}</a>'))
+    if rec.get("registry:status"):
+        rows.append(("Status", e(rec["registry:status"].capitalize())))
+    tags = first(rec, "registry:tags", "tags")
+    if tags:
+        rows.append(("Tags", e(", ".join(tags))))
+    return "\n".join(f"  <li><strong>{k}:</strong> {v}</li>" for k, v in rows)
+
+def source(rec: dict) -> str:
+    # Wikipedia-derived records: raw capture link + attribution
+    src = rec.get("registry:source") or (rec.get("source") or {}).get("wikipedia")
+    if not src or not src.get("pageTitle"):
+        return ""
+    e = html.escape
+    raw = f"/sources/raw/wikipedia/{slugify(src['pageTitle'])}/query.json"
+    retrieved = (src.get("retrievedAt") or "")[:10]
+    return (f'<p><strong>Raw source capture:</strong> <a href="../..{raw}">{raw}</a></p>\n\n'
+            f"<h2>Attribution</h2>\n<p>\n"
+            f"This entry incorporates information derived from Wikipedia (facts/metadata only).\n"
+            f"Source: “{e(src['pageTitle'])}”, Wikipedia, retrieved {e(retrieved)} (CC-BY-SA 4.0).\n"
+            f"</p>\n")
+
+def render(rid: str) -> tuple[str, bytes, bytes]:
+    rec = load_json(f"data/{rid}.jsonld")
+    t = templates()
+    page = t["page.html"].substitute(id=rid, title=html.escape(label(rec, rid)),
+                                     facts=facts(rec, rid), source=source(rec))
+    idp = t["id.html"].substitute(id=rid)
+    return rid, page.encode("utf-8"), idp.encode("utf-8")
+
+def render_all(rids: list[str], jobs: int):
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if jobs == 1 or len(rids) < 2:
+        yield from map(render, rids)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs) as ex:
+        yield from ex.map(render, rids, chunksize=max(1, len(rids) // (jobs * 8)))
+
+def load_state() -> dict:
+    try:
+        st = load_json(STATE_PATH)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return st if st.get("version") == STATE_VERSION else {}
+
+def main(argv: list[str]) -> int:
+    profile.setup(argv)
+    jobs = pop_jobs(argv)
+    force = "--force" in argv
+    argv = [a for a in argv if a != "--force"]
+    all_ids = list_ids()
+    rids = sorted(a.upper() for a in argv) if argv else all_ids
+    known = set(all_ids)
+    missing = [rid for rid in rids if rid not in known]
+    for rid in missing:
+        if os.path.isfile(f"data/{rid}.jsonld"):
+            print(f"FAIL: {rid} is not synced into manifests/ids.json; run python3 tools/reg_ids.py sync")
+        else:
+            print(f"FAIL: missing data/{rid}.jsonld")
+    if missing:
+        return 2
+
+    state = load_state()
+    digest = templates_digest()
+    # Entries are only valid for the templates they were rendered with
+    recs = dict(state.get("records", {})) if state.get("templates") == digest else {}
+    prev = {} if force else dict(recs)
+
+    todo, manual = [], 0
+    for rid in rids:
+        st = os.stat(f"data/{rid}.jsonld")
+        cur = {"mtimeNs": st.st_mtime_ns, "size": st.st_size}
+        outs = out_paths(rid)
+        if prev.get(rid) == cur and all(os.path.isfile(p) for p in outs):
+            continue
+        if not force and any(os.path.isfile(p) and not is_generated(p) for p in outs):
+            manual += 1  # hand-maintained: never overwritten implicitly, and not recorded as rendered
+            recs.pop(rid, None)
+            continue
+        recs[rid] = cur
+        todo.append(rid)
+
+    written = 0
+    with output_txn():
+        for rid, page, idp in render_all(todo, jobs):
+            page_path, id_path = out_paths(rid)
+            written += write_bytes(page_path, page)
+            written += write_bytes(id_path, idp)
+        write_json(STATE_PATH, {"version": STATE_VERSION, "templates": digest, "records": recs})
+
+    print(f"OK: rendered pages (ids={len(rids)} rendered={len(todo)} written={written} hand-maintained={manual})")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
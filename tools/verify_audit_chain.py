@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Verify the audit log hash chain, starting from the last trusted entry.
+
+Usage:
+  python3 tools/verify_audit_chain.py                         # whole log
+  python3 tools/verify_audit_chain.py --state .build/audit_chain.json
+  python3 tools/verify_audit_chain.py --trust 000101:sha256:<hex>
+
+Every entry from the head's chainStart on must carry prevEntrySha256 and
+link to the previous entry file; only entries before it may be unlinked.
+With --state the last verified entry (seq + entry file hash) and chainStart
+are remembered: the next run only walks entries appended after it, fails
+if chainStart moved or disappeared (links stripped), and fails if the log
+now ends before the remembered entry (truncated). The anchor itself is
+re-hashed first, so rewriting history behind it fails.
+"""
+
+import argparse, os, sys
+
+from registry_core import load_json, sha256_file, write_json
+from registry_core.auditlog import AuditLog, seq_name
+
+def main():
+    ap = argparse.ArgumentParser(description="Verify audit/logs prevEntrySha256 links.")
+    ap.add_argument("--state", help="file holding the last trusted entry and chainStart; updated on success")
+    ap.add_argument("--trust", help="explicit anchor SEQ:sha256:<hex> (overrides --state)")
+    args = ap.parse_args()
+
+    log = AuditLog()
+    head = log.head()
+    latest = head["latestSeq"]
+
+    state = load_json(args.state) if args.state and os.path.isfile(args.state) else {}
+    chain_start = head.get("chainStart")
+    if "chainStart" in state and state["chainStart"] != chain_start:
+        print(f"FAIL: chainStart is {chain_start}, trusted {state['chainStart']} (links stripped or rewritten)")
+        return 2
+
+    anchor = None
+    if args.trust:
+        seq, sha = args.trust.split(":", 1)
+        anchor = {"seq": int(seq), "entrySha256": sha}
+    elif "seq" in state:
+        anchor = {"seq": state["seq"], "entrySha256": state["entrySha256"]}
+
+    start = 1
+    prev_sha = None
+    if anchor:
+        if latest < anchor["seq"]:
+            print(f"FAIL: log ends at {seq_name(latest)}, before trusted entry {seq_name(anchor['seq'])} (truncated)")
+            return 2
+        path = log.entry_path(anchor["seq"])
+        if not os.path.isfile(path):
+            print(f"FAIL: trusted entry {path} is missing")
+            return 2
+        prev_sha = f"sha256:{sha256_file(path)}"
+        if prev_sha != anchor["entrySha256"]:
+            print(f"FAIL: trusted entry {seq_name(anchor['seq'])} was rewritten")
+            print(f"  trusted: {anchor['entrySha256']}")
+            print(f"  actual:  {prev_sha}")
+            return 2
+        start = anchor["seq"] + 1
+
+    chained = chain_start is not None and start > chain_start
+    checked = 0
+    new_anchor = anchor
+    for seq in range(start, latest + 1):
+        path = log.entry_path(seq)
+        if not os.path.isfile(path):
+            print(f"FAIL: missing {path}")
+            return 2
+        entry = load_json(path)
+        linked = "prevEntrySha256" in entry
+        must_link = chained or (chain_start is not None and seq >= chain_start)
+        if not linked and not must_link:
+            prev_sha = f"sha256:{sha256_file(path)}"  # legacy entry written before chaining
+            new_anchor = {"seq": seq, "entrySha256": prev_sha}
+            continue
+        if not linked:
+            print(f"FAIL: {seq_name(seq)} has no prevEntrySha256 but the chain starts at {seq_name(chain_start or seq)}")
+            return 2
+        if chain_start is None:
+            # Older heads do not record chainStart: the first linked entry fixes it
+            chain_start = seq
+        chained = True
+        link = entry["prevEntrySha256"]
+        if link != prev_sha:
+            print(f"FAIL: chain broken at {seq_name(seq)}")
+            print(f"  expected: {prev_sha}")
+            print(f"  linked:   {link}")
+            return 2
+        prev_sha = f"sha256:{sha256_file(path)}"
+        checked += 1
+        new_anchor = {"seq": seq, "entrySha256": prev_sha}
+
+    if args.state and new_anchor:
+        write_json(args.state, {**new_anchor, **({"chainStart": chain_start} if chain_start else {})})
+    since = seq_name(anchor["seq"]) if anchor else "start"
+    print(f"OK: audit chain verified from {since} to {seq_name(latest)} (links={checked})")
+    if new_anchor:
+        print(f"OK: trusted entry {seq_name(new_anchor['seq'])} {new_anchor['entrySha256']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
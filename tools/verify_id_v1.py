@@ -1,32 +1,22 @@
 #!/usr/bin/env python3
-import sys, json, hashlib, urllib.request
+import sys
 
-BASE = "https://napier369.github.io/registry.parasks"
-
-def http_get_json(path: str) -> dict:
-    url = BASE + path
-    req = urllib.request.Request(url, headers={"User-Agent": "registry.parasks verifier"})
-    with urllib.request.urlopen(req, timeout=30) as r:
-        return json.loads(r.read().decode("utf-8"))
-
-def canon_sorted_min(obj: dict) -> bytes:
-    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
-
-def sha256_hex(b: bytes) -> str:
-    return hashlib.sha256(b).hexdigest()
+from registry_core import HttpClient, hash_hex, http_get_json, profile, seal_obj
 
 def main():
+    profile.setup(sys.argv)
     if len(sys.argv) != 2:
         print("USAGE: verify_id_v1.py <ID>", file=sys.stderr)
         return 2
     rid = sys.argv[1].strip()
 
-    bundle = http_get_json(f"/api/v1/bundle/{rid}.json")
-    expected = bundle["contentHash"].split("sha256:", 1)[-1].strip()
-    data = http_get_json(bundle["data"])
+    client = HttpClient(user_agent="registry.parasks verifier")
+    bundle = http_get_json(f"/api/v1/bundle/{rid}.json", client)
+    expected = hash_hex(bundle["contentHash"])
+    data = http_get_json(bundle["data"], client)
 
-    # v1 sealed rule: data carries placeholder contentHash, hash canonical sorted_min
-    actual = sha256_hex(canon_sorted_min(data))
+    # v1 sealed rule: neutralize contentHash to the placeholder, hash canonical sorted_min
+    actual = hash_hex(seal_obj(data))
 
     print(f"ID: {rid}")
     print(f"expected (bundle): {expected}")